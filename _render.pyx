@@ -0,0 +1,48 @@
+# cython: language_level=3
+"""
+Renderização compilada das linhas de tabela do HTMLGenerator (opcional)
+
+Compilar no diretório do projeto com:
+    pip install cython
+    cythonize -i _render.pyx
+
+Sem a extensão compilada, html_generator usa as versões em Python puro,
+que produzem exatamente o mesmo HTML.
+"""
+
+cdef dict _HTML_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
+
+
+cdef inline str _cell(object value):
+    """Texto da célula sem espaços nas pontas e com HTML escapado"""
+    cdef str text = value if type(value) is str else str(value)
+    return text.strip().translate(_HTML_ESCAPE)
+
+
+cpdef str render_header(object headers):
+    """Gera as células <th> do cabeçalho"""
+    cdef list out = []
+    cdef object header
+
+    for header in headers:
+        out.append('                    <th>')
+        out.append(_cell(header))
+        out.append('</th>\n')
+
+    return ''.join(out)
+
+
+cpdef str render_body(object rows):
+    """Gera as linhas <tr> do corpo da tabela"""
+    cdef list out = []
+    cdef object row, cell
+
+    for row in rows:
+        out.append('                <tr>\n')
+        for cell in row:
+            out.append('                    <td>')
+            out.append(_cell(cell))
+            out.append('</td>\n')
+        out.append('                </tr>\n')
+
+    return ''.join(out)
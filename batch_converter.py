@@ -4,23 +4,110 @@ Linha de comando para automação
 """
 
 import argparse
+import asyncio
+import hashlib
+import json
+import mmap
+import os
 import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from itertools import repeat
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
 import time
 from datetime import datetime
 
-from pdf_extractor import PDFExtractor
-from html_generator import HTMLGenerator
+if TYPE_CHECKING:
+    # Só para a anotação: o gerador é importado de fato na primeira conversão
+    from html_generator import HTMLGenerator
+
+
+# Threads de I/O usadas quando o método é "pymupdf" (extensão C libera a GIL)
+DEFAULT_IO_WORKERS = 8
+
+# Cache de extração por conteúdo do PDF (memória + disco entre execuções)
+EXTRACT_CACHE_SIZE = 128
+# Incrementar sempre que o formato das páginas mudar (chaves novas, outro significado)
+EXTRACT_CACHE_VERSION = 3
+EXTRACT_CACHE_DIR = Path.home() / ".pdf_converter" / "extract_cache"
+
+# A partir deste tamanho o PDF não é lido inteiro: o hash usa mmap e o PyMuPDF
+# abre pelo caminho, lendo só os objetos que a extração consulta
+LARGE_PDF_BYTES = 100 * 1024 * 1024
+
+_extract_cache = OrderedDict()
+_extract_cache_lock = threading.Lock()
+
+
+def read_pdf(pdf_path: Path) -> bytes:
+    """Lê o PDF inteiro numa única leitura, reaproveitada pelo hash e pelo parsing"""
+    with open(pdf_path, 'rb') as f:
+        return f.read()
+
+
+def hash_pdf_mapped(pdf_path: Path) -> str:
+    """SHA-1 do PDF lido via mmap (páginas trazidas sob demanda, sem cópia em bytes)"""
+    with open(pdf_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # Leitura única, do início ao fim
+            if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            return hashlib.sha1(mapped).hexdigest()
+
+
+def _link_exclusive(src: Path, dst: Path) -> bool:
+    """Publica src em dst sem sobrescrever; retorna False se dst já existe"""
+    try:
+        # link() é atômico e falha se o destino existir (sem janela entre checar e gravar)
+        os.link(src, dst)
+    except FileExistsError:
+        return False
+    except OSError:
+        # Sistema de arquivos sem hard links (ex.: FAT, alguns compartilhamentos)
+        if os.path.exists(dst):
+            return False
+        os.replace(src, dst)
+    return True
+
+
+def default_workers() -> int:
+    """Número padrão de processos: todos os núcleos menos um"""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+# Conversor reaproveitado por todas as tarefas de um mesmo processo worker
+_worker_converters = {}
+
+
+def _convert_one(pdf_path: Path, output_dir: Optional[Path], method: str,
+                 theme: str, verbose: bool, use_cache: bool = True,
+                 overwrite: bool = True) -> Optional[bool]:
+    """Converte um arquivo em processo separado (função de módulo para pickle)"""
+    key = (method, theme, verbose, use_cache)
+    converter = _worker_converters.get(key)
+    if converter is None:
+        converter = _worker_converters[key] = BatchConverter(
+            method=method, theme=theme, verbose=verbose, use_cache=use_cache
+        )
+    try:
+        return converter.convert_file(pdf_path, output_dir, overwrite)
+    finally:
+        converter.flush_log()
 
 
 class BatchConverter:
     """Conversor em lote de PDFs"""
     
-    def __init__(self, method="auto", theme="premium", verbose=True):
+    def __init__(self, method="auto", theme="premium", verbose=True, use_cache=True):
         self.method = method
         self.theme = theme
         self.verbose = verbose
+        self.use_cache = use_cache
+        
+        # Processos por arquivo para extração página a página (só fora de um pool)
+        self.page_workers = 1
         self.stats = {
             'total': 0,
             'success': 0,
@@ -29,6 +116,87 @@ class BatchConverter:
             'start_time': None,
             'end_time': None
         }
+        
+        # Instâncias reutilizadas entre arquivos (o extrator não guarda estado
+        # por documento; o gerador guarda o TOC, então há um por thread).
+        # Import tardio: fitz/pdfplumber só são carregados quando há conversão.
+        from pdf_extractor import AdvancedPDFExtractor
+        self._extractor = AdvancedPDFExtractor(method=method, log_callback=self._emit)
+        self._local = threading.local()
+        
+        # Mensagens acumuladas e gravadas em stderr de uma vez (ver flush_log)
+        self._logbuf = []
+        self._log_lock = threading.Lock()
+    
+    def _get_generator(self) -> 'HTMLGenerator':
+        """Retorna o HTMLGenerator da thread atual, criando-o na primeira vez"""
+        generator = getattr(self._local, 'generator', None)
+        if generator is None:
+            from html_generator import HTMLGenerator
+            generator = self._local.generator = HTMLGenerator(
+                theme=self.theme,
+                include_toc=True,
+                responsive=True,
+                animations=True,
+                dark_mode=True
+            )
+        # Arquivo único: páginas geradas com os mesmos processos da extração
+        generator.workers = self.page_workers
+        return generator
+    
+    def _cached_extract(self, pdf_path: Path) -> List[Dict]:
+        """Extrai o PDF reaproveitando resultados de conteúdo idêntico"""
+        if not self.use_cache:
+            return self._extract(pdf_path)
+        
+        if pdf_path.stat().st_size >= LARGE_PDF_BYTES:
+            # PDF grande: hash pelo mapeamento e extração pelo caminho
+            data = None
+            key = (hash_pdf_mapped(pdf_path), self.method)
+        else:
+            # Uma leitura só: os mesmos bytes geram a chave e alimentam o PyMuPDF
+            data = read_pdf(pdf_path)
+            key = (hashlib.sha1(data).hexdigest(), self.method)
+        
+        with _extract_cache_lock:
+            pages_data = _extract_cache.get(key)
+            if pages_data is not None:
+                _extract_cache.move_to_end(key)
+                self.log(f"  Cache de extração (memória): {pdf_path.name}", "info")
+                return pages_data
+        
+        cache_file = EXTRACT_CACHE_DIR / f"{key[0]}_{key[1]}_v{EXTRACT_CACHE_VERSION}.json"
+        pages_data = None
+        
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                pages_data = json.load(f)
+            self.log(f"  Cache de extração (disco): {pdf_path.name}", "info")
+        except (OSError, ValueError):
+            pages_data = self._extract(pdf_path, stream=data)
+            
+            try:
+                # Sem default=str: um valor fora do JSON não vira texto em silêncio
+                # (o cache devolveria tipos diferentes da extração); só não é gravado
+                serialized = json.dumps(pages_data, ensure_ascii=False)
+                EXTRACT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                with open(cache_file, 'w', encoding='utf-8') as f:
+                    f.write(serialized)
+            except (TypeError, ValueError, OSError) as e:
+                self.log(f"  Não foi possível gravar o cache: {e}", "warning")
+        
+        with _extract_cache_lock:
+            _extract_cache[key] = pages_data
+            if len(_extract_cache) > EXTRACT_CACHE_SIZE:
+                _extract_cache.popitem(last=False)
+        
+        return pages_data
+    
+    def _extract(self, pdf_path: Path, stream: Optional[bytes] = None) -> List[Dict]:
+        """Extrai o PDF, dividindo as páginas entre processos quando configurado"""
+        if self.page_workers > 1:
+            return self._extractor.extract_parallel(pdf_path, self.page_workers, stream)
+        return self._extractor.extract(pdf_path, stream)
     
     def log(self, message, level="info"):
         """Logger condicional"""
@@ -43,46 +211,91 @@ class BatchConverter:
         }
         
         icon = icons.get(level, 'ℹ️')
-        print(f"{icon} {message}")
+        self._emit(f"{icon} {message}")
+    
+    def _emit(self, line: str):
+        """Acumula uma linha de log (também usado como callback do extrator)"""
+        if not self.verbose:
+            return
+        
+        with self._log_lock:
+            self._logbuf.append(line)
+    
+    def flush_log(self):
+        """Grava as mensagens acumuladas numa única escrita em stderr"""
+        with self._log_lock:
+            lines, self._logbuf = self._logbuf, []
+        
+        if lines:
+            sys.stderr.write('\n'.join(lines) + '\n')
+            sys.stderr.flush()
+    
+    def iter_pdfs(self, directory: Path, recursive=False) -> Iterator[Path]:
+        """Percorre o diretório com os.scandir e gera os PDFs encontrados"""
+        # scandir já traz o tipo da entrada, evitando um lstat por arquivo
+        with os.scandir(directory) as entries:
+            subdirs = []
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    if entry.name.lower().endswith('.pdf'):
+                        yield Path(entry.path)
+                elif recursive and entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+        
+        # Descer nos subdiretórios só depois de fechar o iterador atual
+        for subdir in subdirs:
+            yield from self.iter_pdfs(subdir, recursive)
     
     def find_pdfs(self, directory: Path, recursive=False) -> List[Path]:
         """Encontra todos os PDFs em um diretório"""
-        pattern = "**/*.pdf" if recursive else "*.pdf"
-        return list(directory.glob(pattern))
+        return list(self.iter_pdfs(directory, recursive))
+    
+    def output_path_for(self, pdf_path: Path, output_dir: Path = None) -> Path:
+        """Caminho do HTML gerado para um PDF"""
+        if output_dir:
+            return output_dir / f"{pdf_path.stem}.html"
+        return pdf_path.parent / f"{pdf_path.stem}.html"
     
-    def convert_file(self, pdf_path: Path, output_dir: Path = None) -> bool:
-        """Converte um único arquivo"""
+    def convert_file(self, pdf_path: Path, output_dir: Path = None,
+                     overwrite: bool = True) -> Optional[bool]:
+        """Converte um único arquivo
+        
+        Retorna True/False para sucesso/falha e None quando o HTML já existe
+        e `overwrite` é False.
+        """
+        tmp_path = None
         try:
             self.log(f"Processando: {pdf_path.name}", "info")
             
-            # Extrair dados
-            extractor = PDFExtractor(method=self.method, log_callback=None)
-            pages_data = extractor.extract(pdf_path)
+            # Extrair dados (ou reaproveitar de um PDF idêntico já processado)
+            pages_data = self._cached_extract(pdf_path)
             
             if not pages_data:
                 self.log(f"  Nenhum dado extraído de {pdf_path.name}", "warning")
                 return False
             
-            # Gerar HTML
-            generator = HTMLGenerator(
-                theme=self.theme,
-                include_toc=True,
-                responsive=True,
-                animations=True,
-                dark_mode=True
-            )
-            html_content = generator.generate(pages_data)
-            
             # Determinar caminho de saída
             if output_dir:
                 output_dir.mkdir(parents=True, exist_ok=True)
-                output_path = output_dir / f"{pdf_path.stem}.html"
-            else:
-                output_path = pdf_path.parent / f"{pdf_path.stem}.html"
+            output_path = self.output_path_for(pdf_path, output_dir)
+            
+            # Gerar HTML e gravar em streaming, sem montar o documento inteiro em memória.
+            # O arquivo temporário (único por processo/thread) evita HTML truncado
+            # se a conversão for interrompida no meio da escrita.
+            tmp_path = output_path.with_name(
+                f".{output_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            with open(tmp_path, 'wb', buffering=1 << 20) as f:
+                self._get_generator().generate_to(pages_data, f, encoding='utf-8')
             
-            # Salvar
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            if overwrite:
+                os.replace(tmp_path, output_path)
+                tmp_path = None
+            elif not _link_exclusive(tmp_path, output_path):
+                # Outro processo criou o HTML depois da filtragem inicial
+                self.log(f"{pdf_path.name}: ⏭️ Já existe (use --overwrite para substituir)",
+                         "warning")
+                return None
             
             self.log(f"  ✓ Salvo: {output_path.name}", "success")
             return True
@@ -90,10 +303,19 @@ class BatchConverter:
         except Exception as e:
             self.log(f"  ❌ Erro: {str(e)}", "error")
             return False
+        
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
     
     def convert_batch(self, pdf_files: List[Path], output_dir: Path = None, 
-                     overwrite=False):
-        """Converte múltiplos arquivos"""
+                     overwrite=False, workers: Optional[int] = None,
+                     async_concurrency: Optional[int] = None,
+                     io_workers: int = DEFAULT_IO_WORKERS, sort_by_size=True):
+        """Converte múltiplos arquivos (em paralelo quando há mais de um)"""
         
         self.stats['total'] = len(pdf_files)
         self.stats['start_time'] = time.time()
@@ -102,33 +324,115 @@ class BatchConverter:
         self.log(f"  CONVERSÃO EM LOTE - {self.stats['total']} arquivo(s)", "info")
         self.log(f"{'='*70}\n", "info")
         
-        for i, pdf_path in enumerate(pdf_files, 1):
-            self.log(f"[{i}/{self.stats['total']}] {pdf_path.name}", "info")
+        # Filtra os arquivos já convertidos antes de distribuir o trabalho
+        to_convert = []
+        for pdf_path in pdf_files:
+            output_path = self.output_path_for(pdf_path, output_dir)
             
-            # Verificar se já existe
-            if output_dir:
-                output_path = output_dir / f"{pdf_path.stem}.html"
-            else:
-                output_path = pdf_path.parent / f"{pdf_path.stem}.html"
-            
-            if output_path.exists() and not overwrite:
-                self.log(f"  ⏭️ Já existe (use --overwrite para substituir)", "warning")
+            if not overwrite and output_path.exists():
+                self.log(f"{pdf_path.name}: ⏭️ Já existe (use --overwrite para substituir)", "warning")
                 self.stats['skipped'] += 1
                 continue
             
-            # Converter
-            if self.convert_file(pdf_path, output_dir):
-                self.stats['success'] += 1
-            else:
-                self.stats['failed'] += 1
-            
-            print()  # Linha em branco entre arquivos
+            to_convert.append(pdf_path)
+        
+        # Maiores primeiro (LPT): o arquivo mais lento não fica para o fim do lote
+        if sort_by_size and len(to_convert) > 1:
+            to_convert.sort(key=lambda p: p.stat().st_size, reverse=True)
+        
+        workers = workers or default_workers()
+        
+        # pypdfium2 não é thread-safe: com pdfium o lote fica no pool de processos
+        if async_concurrency and self.method == 'pdfium':
+            self.log("--async-concurrency ignorado com --method pdfium "
+                     "(pypdfium2 não é thread-safe); usando processos", "warning")
+            async_concurrency = None
+        
+        # Um único arquivo: os processos vão para as páginas, não para os arquivos
+        self.page_workers = workers if len(to_convert) == 1 and not async_concurrency else 1
+        workers = min(workers, len(to_convert))
+        self.flush_log()
+        
+        if async_concurrency and to_convert:
+            # Threads via asyncio: sobrepõe leitura/escrita de disco com o parsing
+            asyncio.run(self._convert_batch_async(to_convert, output_dir, async_concurrency,
+                                                  overwrite))
+        elif len(to_convert) <= 1 or (workers <= 1 and self.method != 'pymupdf'):
+            # Sequencial: evita o custo de subir um pool para um único arquivo
+            self._collect_results(
+                to_convert, (self.convert_file(p, output_dir, overwrite) for p in to_convert)
+            )
+        elif self.method == 'pymupdf':
+            # PyMuPDF libera a GIL: threads sobrepõem a escrita de um arquivo
+            # com o parsing do próximo, sem custo de pickle entre processos
+            self.log(f"Usando {io_workers} thread(s) de I/O\n", "info")
+            with ThreadPoolExecutor(max_workers=io_workers) as executor:
+                futures = {
+                    executor.submit(self.convert_file, p, output_dir, overwrite): p
+                    for p in to_convert
+                }
+                for i, future in enumerate(as_completed(futures), 1):
+                    self._record_result(i, len(to_convert), futures[future], future.result())
+        else:
+            self.log(f"Usando {workers} processo(s) em paralelo\n", "info")
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(
+                    _convert_one, to_convert, repeat(output_dir), repeat(self.method),
+                    repeat(self.theme), repeat(self.verbose), repeat(self.use_cache),
+                    repeat(overwrite), chunksize=1
+                )
+                self._collect_results(to_convert, results)
         
         self.stats['end_time'] = time.time()
         self.print_summary()
     
+    async def _convert_batch_async(self, pdf_files: List[Path], output_dir: Optional[Path],
+                                   max_concurrency: int = 50, overwrite: bool = True):
+        """Converte arquivos em threads com concorrência limitada por semáforo"""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            async def process(pdf_path):
+                async with semaphore:
+                    ok = await loop.run_in_executor(executor, self.convert_file, pdf_path,
+                                                    output_dir, overwrite)
+                return pdf_path, ok
+            
+            tasks = [process(p) for p in pdf_files]
+            
+            # Progresso na ordem de conclusão, não na ordem de submissão
+            for i, next_done in enumerate(asyncio.as_completed(tasks), 1):
+                pdf_path, ok = await next_done
+                self._record_result(i, len(pdf_files), pdf_path, ok)
+    
+    def _collect_results(self, pdf_files: List[Path], results):
+        """Atualiza estatísticas conforme os resultados chegam"""
+        total = len(pdf_files)
+        
+        for i, (pdf_path, ok) in enumerate(zip(pdf_files, results), 1):
+            self._record_result(i, total, pdf_path, ok)
+    
+    def _record_result(self, index: int, total: int, pdf_path: Path, ok: Optional[bool]):
+        """Contabiliza o resultado de um arquivo (None = ignorado, HTML já existia)"""
+        if ok is None:
+            self.stats['skipped'] += 1
+        elif ok:
+            self.stats['success'] += 1
+        else:
+            self.stats['failed'] += 1
+        
+        status = "error" if ok is False else "success"
+        self.log(f"[{index}/{total}] {pdf_path.name}", status)
+        self._emit('')  # Linha em branco entre arquivos
+        
+        # Uma escrita por arquivo concluído, não uma por mensagem
+        self.flush_log()
+    
     def print_summary(self):
         """Imprime resumo da conversão"""
+        self.flush_log()
+        
         duration = self.stats['end_time'] - self.stats['start_time']
         
         print("\n" + "="*70)
@@ -173,6 +477,9 @@ Exemplos de uso:
   # Sobrescrever arquivos existentes
   python batch_converter.py --overwrite
   
+  # Concorrência assíncrona (threads limitadas por semáforo)
+  python batch_converter.py --async-concurrency 16
+  
   # Modo silencioso (sem verbose)
   python batch_converter.py --quiet
         """
@@ -193,7 +500,7 @@ Exemplos de uso:
     
     parser.add_argument(
         '-m', '--method',
-        choices=['auto', 'camelot', 'pdfplumber', 'pymupdf'],
+        choices=['auto', 'camelot', 'pdfplumber', 'pymupdf', 'pdfium'],
         default='auto',
         help='Método de extração (padrão: auto)'
     )
@@ -217,6 +524,39 @@ Exemplos de uso:
         help='Sobrescrever arquivos HTML existentes'
     )
     
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=default_workers(),
+        help='Número de processos paralelos (padrão: núcleos - 1)'
+    )
+    
+    parser.add_argument(
+        '--io-workers',
+        type=int,
+        default=DEFAULT_IO_WORKERS,
+        help='Threads de I/O usadas com --method pymupdf (padrão: 8)'
+    )
+    
+    parser.add_argument(
+        '--async-concurrency',
+        type=int,
+        help='Usa asyncio com até N conversões simultâneas em threads '
+             '(ignorado com --method pdfium, que não é thread-safe)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Ignorar o cache de extração e reprocessar todos os PDFs'
+    )
+    
+    parser.add_argument(
+        '--no-sort',
+        action='store_true',
+        help='Manter a ordem de descoberta (por padrão, PDFs maiores são convertidos primeiro)'
+    )
+    
     parser.add_argument(
         '-q', '--quiet',
         action='store_true',
@@ -248,7 +588,8 @@ Exemplos de uso:
     converter = BatchConverter(
         method=args.method,
         theme=args.theme,
-        verbose=not args.quiet
+        verbose=not args.quiet,
+        use_cache=not args.no_cache
     )
     
     # Buscar PDFs
@@ -260,7 +601,9 @@ Exemplos de uso:
     
     # Converter
     try:
-        converter.convert_batch(pdf_files, output_dir, args.overwrite)
+        converter.convert_batch(pdf_files, output_dir, args.overwrite, args.workers,
+                                args.async_concurrency, args.io_workers,
+                                sort_by_size=not args.no_sort)
     except KeyboardInterrupt:
         print("\n\n❌ Conversão interrompida pelo usuário")
         sys.exit(1)
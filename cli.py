@@ -10,10 +10,10 @@ from pathlib import Path
 from typing import Optional
 import json
 
-from pdf_extractor import PDFExtractor
-from html_generator import HTMLGenerator
+# Módulos pesados (fitz, pdfplumber, camelot) são importados dentro dos comandos
+# que os usam, para manter --help, config e history instantâneos
 from config_manager import ConfigManager
-from batch_converter import BatchConverter
+from batch_converter import default_workers, DEFAULT_IO_WORKERS
 
 
 # Configuração global
@@ -42,6 +42,9 @@ def cli():
       
       # Ver configurações
       pdf-converter config show
+      
+      # Sessão interativa (vários comandos sem reiniciar)
+      pdf-converter repl
     """
     pass
 
@@ -50,7 +53,7 @@ def cli():
 @click.argument('input_file', type=click.Path(exists=True))
 @click.option('-o', '--output', type=click.Path(), help='Arquivo de saída')
 @click.option('-m', '--method', 
-              type=click.Choice(['auto', 'camelot', 'pdfplumber', 'pymupdf']),
+              type=click.Choice(['auto', 'camelot', 'pdfplumber', 'pymupdf', 'pdfium']),
               default='auto',
               help='Método de extração')
 @click.option('-t', '--theme',
@@ -60,8 +63,11 @@ def cli():
 @click.option('--no-toc', is_flag=True, help='Não incluir índice')
 @click.option('--no-animations', is_flag=True, help='Desabilitar animações')
 @click.option('--light-mode', is_flag=True, help='Usar modo claro')
+@click.option('-w', '--workers', type=int, default=default_workers,
+              help='Processos para extrair e gerar as páginas em paralelo (PDFs grandes)')
 @click.option('-v', '--verbose', is_flag=True, help='Modo verbose')
-def convert(input_file, output, method, theme, no_toc, no_animations, light_mode, verbose):
+def convert(input_file, output, method, theme, no_toc, no_animations, light_mode, workers,
+            verbose):
     """
     Converte um único arquivo PDF para HTML.
     
@@ -74,6 +80,8 @@ def convert(input_file, output, method, theme, no_toc, no_animations, light_mode
       pdf-converter convert input.pdf -o output.html --theme medical
       
       pdf-converter convert data.pdf -m camelot --no-animations
+      
+      pdf-converter convert livro.pdf --workers 4
     """
     input_path = Path(input_file)
     
@@ -95,11 +103,14 @@ def convert(input_file, output, method, theme, no_toc, no_animations, light_mode
         if verbose:
             click.echo("\n📄 Extraindo dados do PDF...")
         
-        extractor = PDFExtractor(
+        from pdf_extractor import AdvancedPDFExtractor
+        from html_generator import HTMLGenerator
+        
+        extractor = AdvancedPDFExtractor(
             method=method,
-            log_callback=lambda msg, level: click.echo(f"   {msg}") if verbose else None
+            log_callback=lambda msg: click.echo(f"   {msg}") if verbose else None
         )
-        pages_data = extractor.extract(input_path)
+        pages_data = extractor.extract_parallel(input_path, workers)
         
         if not pages_data:
             click.echo("❌ Erro: Nenhum dado extraído", err=True)
@@ -117,20 +128,20 @@ def convert(input_file, output, method, theme, no_toc, no_animations, light_mode
             include_toc=not no_toc,
             responsive=True,
             animations=not no_animations,
-            dark_mode=not light_mode
+            dark_mode=not light_mode,
+            workers=workers
         )
-        html = generator.generate(pages_data)
         
-        # Salvar
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html)
+        # Salvar (escrita em streaming, sem montar o documento inteiro)
+        with open(output_path, 'wb', buffering=1 << 20) as f:
+            generator.generate_to(pages_data, f, encoding='utf-8')
         
         click.echo(f"\n✅ Sucesso! Arquivo salvo: {output_path}")
         
         # Perguntar se quer abrir
         if click.confirm('\nDeseja abrir o arquivo?', default=False):
             import webbrowser
-            webbrowser.open(str(output_path))
+            webbrowser.open(output_path.resolve().as_uri(), new=2)
     
     except Exception as e:
         click.echo(f"\n❌ Erro: {str(e)}", err=True)
@@ -146,7 +157,7 @@ def convert(input_file, output, method, theme, no_toc, no_animations, light_mode
 @click.option('-o', '--output-dir', type=click.Path(), 
               help='Diretório de saída')
 @click.option('-m', '--method',
-              type=click.Choice(['auto', 'camelot', 'pdfplumber', 'pymupdf']),
+              type=click.Choice(['auto', 'camelot', 'pdfplumber', 'pymupdf', 'pdfium']),
               default='auto',
               help='Método de extração')
 @click.option('-t', '--theme',
@@ -157,9 +168,20 @@ def convert(input_file, output, method, theme, no_toc, no_animations, light_mode
               help='Buscar PDFs recursivamente')
 @click.option('--overwrite', is_flag=True,
               help='Sobrescrever arquivos existentes')
+@click.option('-w', '--workers', type=int, default=default_workers,
+              help='Número de processos paralelos')
+@click.option('--io-workers', type=int, default=DEFAULT_IO_WORKERS,
+              help='Threads de I/O usadas com --method pymupdf')
+@click.option('--async-concurrency', type=int, default=None,
+              help='Usar asyncio com até N conversões simultâneas')
+@click.option('--no-cache', is_flag=True,
+              help='Ignorar o cache de extração')
+@click.option('--no-sort', is_flag=True,
+              help='Manter a ordem de descoberta (sem priorizar PDFs maiores)')
 @click.option('-q', '--quiet', is_flag=True,
               help='Modo silencioso')
-def batch(input_dir, output_dir, method, theme, recursive, overwrite, quiet):
+def batch(input_dir, output_dir, method, theme, recursive, overwrite, workers,
+          io_workers, async_concurrency, no_cache, no_sort, quiet):
     """
     Converte múltiplos PDFs em lote.
     
@@ -170,14 +192,19 @@ def batch(input_dir, output_dir, method, theme, recursive, overwrite, quiet):
       pdf-converter batch -i docs/ -o html/ --recursive
       
       pdf-converter batch -i . -t medical --overwrite
+      
+      pdf-converter batch -i pdfs/ --workers 4
     """
+    from batch_converter import BatchConverter
+    
     input_path = Path(input_dir)
     output_path = Path(output_dir) if output_dir else None
     
     converter = BatchConverter(
         method=method,
         theme=theme,
-        verbose=not quiet
+        verbose=not quiet,
+        use_cache=not no_cache
     )
     
     # Buscar PDFs
@@ -195,7 +222,8 @@ def batch(input_dir, output_dir, method, theme, recursive, overwrite, quiet):
             return
     
     # Converter
-    converter.convert_batch(pdf_files, output_path, overwrite)
+    converter.convert_batch(pdf_files, output_path, overwrite, workers, async_concurrency,
+                            io_workers, sort_by_size=not no_sort)
 
 
 @cli.group()
@@ -275,20 +303,19 @@ def history():
 def history_list(number, json_format):
     """Lista histórico de conversões."""
     manager = ConfigManager()
-    items = manager.get_history()
+    # Últimos N itens, do mais recente para o mais antigo
+    items = manager.get_recent(number)
     
     if not items:
         click.echo("📭 Histórico vazio")
         return
     
-    # Mostrar últimos N itens
-    items = items[-number:]
-    
     if json_format:
-        click.echo(json.dumps(items, indent=2, ensure_ascii=False))
+        # JSON mantém a ordem cronológica
+        click.echo(json.dumps(items[::-1], indent=2, ensure_ascii=False))
     else:
         click.echo(f"\n📜 Últimas {len(items)} conversões:\n")
-        for i, item in enumerate(reversed(items), 1):
+        for i, item in enumerate(items, 1):
             click.echo(f"{i}. {item.get('input', 'N/A')}")
             click.echo(f"   → {item.get('output', 'N/A')}")
             click.echo(f"   🕐 {item.get('timestamp', 'N/A')}")
@@ -330,7 +357,7 @@ def history_open(number):
         return
     
     import webbrowser
-    webbrowser.open(str(output_path))
+    webbrowser.open(output_path.resolve().as_uri(), new=2)
     click.echo(f"✅ Abrindo: {output_path.name}")
 
 
@@ -343,6 +370,7 @@ def info(input_file):
     Exibe metadados, número de páginas, tabelas detectadas, etc.
     """
     import fitz
+    import numpy as np
     
     pdf_path = Path(input_file)
     
@@ -364,18 +392,28 @@ def info(input_file):
         # Analisar páginas
         click.echo("\n  📊 Análise de Conteúdo:")
         
-        total_text = sum(len(doc[i].get_text()) for i in range(len(doc)))
-        total_images = sum(len(doc[i].get_images()) for i in range(len(doc)))
+        from pdf_extractor import AdvancedPDFExtractor
+        
+        extractor = AdvancedPDFExtractor(log_callback=lambda msg: None)
         
-        click.echo(f"    Caracteres de texto: {total_text:,}")
-        click.echo(f"    Imagens: {total_images}")
+        # Uma única visita por página: texto, imagens e indício de tabela.
+        # As reduções ficam vetorizadas no numpy.
+        text_lengths = np.zeros(len(doc), dtype=np.int64)
+        image_counts = np.zeros(len(doc), dtype=np.int64)
+        table_pages = 0
         
-        # Detectar tabelas potenciais
-        extractor = PDFExtractor()
-        pages_data = extractor.extract(pdf_path)
-        tables_count = sum(1 for p in pages_data if p.get('has_table'))
+        for i, page in enumerate(doc):
+            text_lengths[i] = len(page.get_text())
+            image_counts[i] = len(page.get_images())
+            if extractor.has_table_hint(page):
+                table_pages += 1
         
-        click.echo(f"    Tabelas detectadas: {tables_count}")
+        click.echo(f"    Caracteres de texto: {int(text_lengths.sum()):,}")
+        if len(doc):
+            click.echo(f"    Média por página: {text_lengths.mean():,.0f} "
+                       f"(máx. {int(text_lengths.max()):,})")
+        click.echo(f"    Imagens: {int(image_counts.sum())}")
+        click.echo(f"    Tabelas detectadas: {table_pages} página(s)")
         
         doc.close()
         
@@ -397,6 +435,65 @@ def gui():
         sys.exit(1)
 
 
+@cli.command()
+def repl():
+    """
+    Modo interativo: vários comandos na mesma sessão.
+    
+    Os módulos pesados (PyMuPDF, pdfplumber) são carregados uma única vez,
+    então conversões seguidas não pagam a inicialização do Python de novo.
+    Usa click-repl (histórico, autocompletar) quando instalado.
+    
+    Exemplo:
+    
+      pdf-converter repl
+      pdf-converter> convert documento.pdf -t medical
+      pdf-converter> sair
+    """
+    try:
+        from click_repl import repl as click_repl
+    except ImportError:
+        click_repl = None
+    
+    if click_repl is not None:
+        click_repl(click.get_current_context())
+        return
+    
+    import shlex
+    
+    click.echo("🧠 Modo interativo (digite 'sair' para encerrar, '--help' para ajuda)")
+    
+    while True:
+        try:
+            line = input('pdf-converter> ')
+        except (EOFError, KeyboardInterrupt):
+            click.echo()
+            break
+        
+        try:
+            args = shlex.split(line)
+        except ValueError as e:
+            click.echo(f"❌ {e}", err=True)
+            continue
+        
+        if not args:
+            continue
+        if args[0] in ('sair', 'exit', 'quit'):
+            break
+        if args[0] == 'repl':
+            continue
+        
+        try:
+            cli.main(args, prog_name='pdf-converter', standalone_mode=False)
+        except click.ClickException as e:
+            e.show()
+        except click.Abort:
+            click.echo("Cancelado.")
+        except SystemExit:
+            # Comandos sinalizam erro com sys.exit(); a sessão continua
+            pass
+
+
 @cli.command()
 def doctor():
     """
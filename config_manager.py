@@ -3,84 +3,403 @@ Gerenciador de Configurações
 Salva preferências e histórico
 """
 
+import atexit
+import functools
+import hashlib
 import json
+import os
+import sqlite3
+import threading
+import time
 from pathlib import Path
 from typing import Dict, List, Optional
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps(obj) -> bytes:
+    """Serializa para JSON indentado em UTF-8 (orjson quando disponível)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _dumps_compact(obj) -> str:
+    """Serializa um registro compacto, numa linha (coluna JSON do histórico)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _loads(data: bytes):
+    """Desserializa JSON (orjson quando disponível)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _digest(data: bytes) -> bytes:
+    """Resumo curto do conteúdo (só para detectar mudanças)"""
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+
+@functools.lru_cache(maxsize=None)
+def _ensure_dir(path: Path) -> Path:
+    """Cria o diretório uma única vez por processo"""
+    path.mkdir(exist_ok=True)
+    return path
+
 
 class ConfigManager:
     """Gerencia configurações e histórico da aplicação"""
     
+    # Quantidade de conversões mantidas no histórico
+    HISTORY_LIMIT = 50
+    # Compactar a tabela de histórico a cada N inserções
+    COMPACT_EVERY = 100
+    # enqueue_history: intervalo (s) em que as entradas pendentes são agrupadas
+    HISTORY_FLUSH_INTERVAL = 1.0
+    
     def __init__(self):
         self.config_dir = Path.home() / ".pdf_converter"
         self.config_file = self.config_dir / "config.json"
-        self.history_file = self.config_dir / "history.json"
+        self.history_db = self.config_dir / "history.db"
+        # Formatos antigos do histórico, importados uma vez para o SQLite
+        self.history_file = self.config_dir / "history.jsonl"
+        self.legacy_history_file = self.config_dir / "history.json"
+        self._appends_since_compact = 0
+        # Digest do config.json gravado/lido por último: save_settings igual não regrava
+        self._last_settings_hash: Optional[bytes] = None
+        # Últimas conversões em memória (carregadas no primeiro get_history)
+        self._history_cache: Optional[List[Dict]] = None
+        # Saída da conversão mais recente (consultada no banco só se ainda não conhecida)
+        self._last_output: Optional[str] = None
+        
+        # Write-behind do histórico: entradas pendentes + thread de escrita (lazy)
+        self._pending_history: List[Dict] = []
+        self._history_cond = threading.Condition()
+        self._history_write_lock = threading.Lock()
+        self._history_writer: Optional[threading.Thread] = None
+        
+        # Conexão única, compartilhada entre threads (uso serializado pelo lock)
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
         
         # Criar diretório se não existir
-        self.config_dir.mkdir(exist_ok=True)
+        _ensure_dir(self.config_dir)
         
         # Inicializar arquivos
         self._init_files()
     
     def _init_files(self):
         """Inicializa arquivos de configuração"""
-        if not self.config_file.exists():
-            self.save_settings({})
+        # Modo 'x' cria só se ainda não existir: um open() em vez de exists() + open()
+        try:
+            with open(self.config_file, 'xb') as f:
+                f.write(_dumps({}))
+        except FileExistsError:
+            pass
         
-        if not self.history_file.exists():
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump([], f)
+        try:
+            self._init_db()
+        except sqlite3.Error as e:
+            print(f"Erro ao abrir histórico: {e}")
+    
+    def _init_db(self):
+        """Abre o banco do histórico e importa os arquivos antigos que ainda existirem"""
+        # isolation_level=None: autocommit; transações explícitas em _append_history
+        self._db = sqlite3.connect(
+            str(self.history_db), isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS history ("
+            "id INTEGER PRIMARY KEY, ts TEXT, input TEXT, output TEXT, "
+            "method TEXT, theme TEXT, analysis JSON)"
+        )
+        
+        # Arquivo antigo que não pôde ser importado continua no lugar e é
+        # tentado de novo na próxima abertura
+        self._migrate_legacy_history()
+    
+    def _migrate_legacy_history(self):
+        """Importa o antigo history.json e o history.jsonl para o SQLite
+        
+        Cada arquivo só é apagado depois de lido e gravado no banco; em caso de
+        erro ele fica onde está, com o histórico intacto.
+        """
+        history = []
+        migrated = []
+        # Do formato mais antigo para o mais novo: a ordem das entradas é mantida
+        for legacy_file, reader in ((self.legacy_history_file, self._read_legacy_history),
+                                    (self.history_file, self._read_history)):
+            try:
+                history.extend(reader(legacy_file))
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                print(f"Erro ao migrar histórico ({legacy_file.name}): {e}")
+                continue
+            migrated.append(legacy_file)
+        
+        if not migrated or not self._append_history(history[-self.HISTORY_LIMIT:]):
+            return
+        
+        for legacy_file in migrated:
+            try:
+                legacy_file.unlink()
+            except OSError:
+                pass
+    
+    @staticmethod
+    def _read_history(path: Path) -> List[Dict]:
+        """Lê um history.jsonl, ignorando linhas vazias ou corrompidas"""
+        history = []
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    history.append(_loads(line))
+                except ValueError:
+                    # Linha truncada (ex: gravação interrompida)
+                    continue
+        return history
+    
+    @staticmethod
+    def _read_legacy_history(path: Path) -> List[Dict]:
+        """Lê o antigo history.json (lista única)"""
+        with open(path, 'rb') as f:
+            return _loads(f.read()) or []
+    
+    @staticmethod
+    def _to_row(entry: Dict) -> tuple:
+        """Entrada do histórico -> linha da tabela"""
+        analysis = entry.get('analysis')
+        return (
+            entry.get('timestamp'), entry.get('input'), entry.get('output'),
+            entry.get('method'), entry.get('theme'),
+            None if analysis is None else _dumps_compact(analysis),
+        )
+    
+    @staticmethod
+    def _from_row(row: tuple) -> Dict:
+        """Linha da tabela -> entrada do histórico"""
+        ts, input_file, output_file, method, theme, analysis = row
+        entry = {
+            'input': input_file,
+            'output': output_file,
+            'timestamp': ts,
+            'method': method,
+            'theme': theme,
+        }
+        if analysis is not None:
+            entry['analysis'] = _loads(analysis)
+        return entry
+    
+    def _query_recent(self, n: int) -> List[Dict]:
+        """Últimas n linhas do banco, da mais recente para a mais antiga"""
+        if self._db is None:
+            return []
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT ts, input, output, method, theme, analysis "
+                "FROM history ORDER BY id DESC LIMIT ?", (n,)
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+    
+    def compact_history(self):
+        """Remove do banco as linhas além das últimas conversões"""
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "DELETE FROM history WHERE id NOT IN "
+                    "(SELECT id FROM history ORDER BY id DESC LIMIT ?)",
+                    (self.HISTORY_LIMIT,)
+                )
+            self._appends_since_compact = 0
+        except Exception as e:
+            print(f"Erro ao compactar histórico: {e}")
     
     def save_settings(self, settings: Dict):
-        """Salva configurações"""
+        """Salva configurações (troca atômica; nada é gravado se não mudou)"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, indent=2, ensure_ascii=False)
+            data = _dumps(settings)
+            digest = _digest(data)
+            if digest == self._last_settings_hash:
+                return
+            
+            # Temporário no mesmo diretório + os.replace: nunca fica um arquivo pela metade
+            tmp_file = self.config_file.with_suffix('.json.tmp')
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_file, self.config_file)
+            self._last_settings_hash = digest
         except Exception as e:
             print(f"Erro ao salvar configurações: {e}")
     
     def load_settings(self) -> Optional[Dict]:
         """Carrega configurações salvas"""
         try:
-            if self.config_file.exists():
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            with open(self.config_file, 'rb') as f:
+                data = f.read()
+            settings = _loads(data)
+            self._last_settings_hash = _digest(data)
+            return settings
+        except FileNotFoundError:
+            pass
         except Exception as e:
             print(f"Erro ao carregar configurações: {e}")
         
         return None
     
-    def save_to_history(self, conversion_data: Dict):
-        """Adiciona conversão ao histórico"""
+    def _append_history(self, entries: List[Dict]) -> bool:
+        """Insere as entradas no banco numa única transação"""
+        if self._db is None:
+            return False
         try:
-            history = self.get_history()
-            history.append(conversion_data)
-            
-            # Manter apenas últimas 50 conversões
-            if len(history) > 50:
-                history = history[-50:]
-            
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(history, f, indent=2, ensure_ascii=False)
+            # INSERT por linha: custo constante por conversão
+            with self._db_lock:
+                self._db.execute("BEGIN")
+                try:
+                    self._db.executemany(
+                        "INSERT INTO history (ts, input, output, method, theme, analysis) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        [self._to_row(entry) for entry in entries]
+                    )
+                except BaseException:
+                    self._db.execute("ROLLBACK")
+                    raise
+                self._db.execute("COMMIT")
         
         except Exception as e:
             print(f"Erro ao salvar histórico: {e}")
+            return False
+        
+        # Manter apenas últimas conversões via compactação periódica
+        self._appends_since_compact += len(entries)
+        if self._appends_since_compact >= self.COMPACT_EVERY:
+            self.compact_history()
+        return True
+    
+    def _cache_history(self, conversion_data: Dict):
+        """Cache já carregado acompanha o histórico, sem reler o banco"""
+        self._last_output = conversion_data.get('output')
+        if self._history_cache is not None:
+            self._history_cache.append(conversion_data)
+            del self._history_cache[:-self.HISTORY_LIMIT]
+    
+    def save_to_history(self, conversion_data: Dict):
+        """Adiciona conversão ao histórico"""
+        with self._history_write_lock:
+            saved = self._append_history([conversion_data])
+        if saved:
+            self._cache_history(conversion_data)
+    
+    def enqueue_history(self, conversion_data: Dict):
+        """Adiciona conversão ao histórico sem bloquear (write-behind)
+        
+        A entrada aparece em get_history() na hora; a gravação fica com uma
+        thread em segundo plano, que agrupa as entradas de HISTORY_FLUSH_INTERVAL
+        segundos numa única escrita. Pendências são gravadas na saída do processo.
+        """
+        with self._history_cond:
+            self._pending_history.append(conversion_data)
+            self._cache_history(conversion_data)
+            
+            if self._history_writer is None:
+                self._history_writer = threading.Thread(
+                    target=self._history_writer_loop, name='history-writer', daemon=True
+                )
+                self._history_writer.start()
+                atexit.register(self.flush_history)
+            
+            self._history_cond.notify()
+    
+    def _history_writer_loop(self):
+        """Thread de escrita: espera entradas, agrupa por um intervalo e grava"""
+        while True:
+            with self._history_cond:
+                while not self._pending_history:
+                    self._history_cond.wait()
+            
+            time.sleep(self.HISTORY_FLUSH_INTERVAL)
+            self.flush_history()
+    
+    def flush_history(self):
+        """Grava agora as entradas pendentes de enqueue_history"""
+        # O lock de escrita mantém a ordem entre a thread e chamadas diretas
+        with self._history_write_lock:
+            with self._history_cond:
+                batch, self._pending_history = self._pending_history, []
+            if batch:
+                self._append_history(batch)
     
     def get_history(self) -> List[Dict]:
         """Retorna histórico de conversões"""
+        if self._history_cache is not None:
+            return list(self._history_cache)
+        
+        try:
+            # Pendências do write-behind entram no banco antes da leitura
+            self.flush_history()
+            self._history_cache = self._query_recent(self.HISTORY_LIMIT)[::-1]
+            return list(self._history_cache)
+        except Exception as e:
+            print(f"Erro ao carregar histórico: {e}")
+        
+        return []
+    
+    def get_recent(self, n: int = 10) -> List[Dict]:
+        """Retorna as n conversões mais recentes, da mais nova para a mais antiga"""
+        if n <= self.HISTORY_LIMIT:
+            # Até o limite mantido: servido do cache (carregado aqui na primeira vez)
+            if self._history_cache is None:
+                self.get_history()
+            if self._history_cache is not None:
+                return self._history_cache[:-n - 1:-1] if n > 0 else []
+        
         try:
-            if self.history_file.exists():
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            self.flush_history()
+            return self._query_recent(n)
         except Exception as e:
             print(f"Erro ao carregar histórico: {e}")
         
         return []
     
+    def get_last_output(self) -> Optional[str]:
+        """Arquivo gerado pela conversão mais recente (None se o histórico está vazio)"""
+        if self._last_output is None and self._db is not None:
+            try:
+                with self._db_lock:
+                    row = self._db.execute(
+                        "SELECT output FROM history ORDER BY id DESC LIMIT 1"
+                    ).fetchone()
+                if row is not None:
+                    self._last_output = row[0]
+            except Exception as e:
+                print(f"Erro ao carregar histórico: {e}")
+        
+        return self._last_output
+    
     def clear_history(self):
         """Limpa histórico"""
-        with open(self.history_file, 'w', encoding='utf-8') as f:
-            json.dump([], f)
+        with self._history_write_lock:
+            with self._history_cond:
+                self._pending_history = []
+            if self._db is not None:
+                with self._db_lock:
+                    self._db.execute("DELETE FROM history")
+            self._history_cache = []
+            self._last_output = None
+            self._appends_since_compact = 0
     
     def get_default_settings(self) -> Dict:
         """Retorna configurações padrão"""
@@ -91,5 +410,6 @@ class ConfigManager:
             'responsive_design': True,
             'animations': True,
             'dark_mode': True,
+            'parallel_extraction': True,
             'language': 'pt-BR'
         }
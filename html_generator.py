@@ -3,106 +3,310 @@ Gerador de HTML com Design Neumórfico Dark + Neon Blue
 Inspirado em layouts profissionais de documentação médica
 """
 
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Dict, Optional, Tuple
+import io
 import re
+import sys
+
+
+# Abaixo disso, subir processos custa mais que o ganho de gerar páginas em paralelo
+PAGE_PARALLEL_MIN_PAGES = 8
+
+# Padrões compilados uma vez (slug de IDs e marcadores de lista)
+_ID_STRIP = re.compile(r'[^\w\s-]')
+_ID_DASH = re.compile(r'[-\s]+')
+# Um item por linha: sem espaços nas pontas e sem o marcador inicial (•, -, →...)
+_LIST_ITEMS = re.compile(r'^[^\S\n]*(?:[•\-→▪◦][^\S\n]*)?(.*?)[^\S\n]*$', re.MULTILINE)
+
+# Escape de HTML numa única passada em C (str.translate)
+_HTML_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
+
+
+# Minificação de CSS/JS (aplicada uma vez, na importação do módulo)
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+_CSS_SPACE = re.compile(r'\s+')
+_CSS_PUNCT = re.compile(r'\s*([{}:;,])\s*')
+_JS_COMMENT_LINE = re.compile(r'^\s*//.*$', re.MULTILINE)
+
+
+def _minify_css(css: str) -> str:
+    """Remove comentários e espaços redundantes do CSS"""
+    css = _CSS_COMMENT.sub('', css)
+    css = _CSS_SPACE.sub(' ', css)
+    return _CSS_PUNCT.sub(r'\1', css).strip()
+
+
+def _minify_js(js: str) -> str:
+    """Remove comentários de linha, indentação e linhas vazias (mantém as quebras)"""
+    js = _JS_COMMENT_LINE.sub('', js)
+    return '\n'.join(line.strip() for line in js.splitlines() if line.strip())
+
+
+def _esc(value, _table=_HTML_ESCAPE) -> str:
+    """Escapa texto extraído do PDF para inserção segura no HTML"""
+    if not isinstance(value, str):
+        value = str(value)
+    return value.translate(_table)
+
+
+# Marcações repetidas em toda célula: um único objeto str, reaproveitado no join
+_TH_OPEN = sys.intern('                    <th>')
+_TH_CLOSE = sys.intern('</th>\n')
+_TR_OPEN = sys.intern('                <tr>\n')
+_TR_CLOSE = sys.intern('                </tr>\n')
+_TD_OPEN = sys.intern('                    <td>')
+_TD_CLOSE = sys.intern('</td>\n')
+
+
+# Células vindas do extrator já são str; str() só é chamado para outros tipos
+
+def _render_header(headers) -> str:
+    """Gera as células <th> do cabeçalho da tabela"""
+    parts = []
+    append = parts.append
+    for h in headers:
+        append(_TH_OPEN)
+        append(_esc((h if h.__class__ is str else str(h)).strip()))
+        append(_TH_CLOSE)
+    return ''.join(parts)
+
+
+def _render_body(rows) -> str:
+    """Gera as linhas <tr> do corpo da tabela"""
+    parts = []
+    append = parts.append
+    for row in rows:
+        append(_TR_OPEN)
+        for c in row:
+            append(_TD_OPEN)
+            append(_esc((c if c.__class__ is str else str(c)).strip()))
+            append(_TD_CLOSE)
+        append(_TR_CLOSE)
+    return ''.join(parts)
+
+
+try:
+    # Versão compilada em Cython das mesmas funções (cythonize -i _render.pyx)
+    from _render import render_header as _render_header, render_body as _render_body
+    RENDER_EXT_AVAILABLE = True
+except ImportError:
+    RENDER_EXT_AVAILABLE = False
+
+
+# Fragmentos estáticos reaproveitados pelos geradores de tabela e TOC
+_TABLE_HEAD_END = '''                </tr>
+            </thead>
+            <tbody>
+'''
+
+_TABLE_END = '''            </tbody>
+        </table>
+    </div>
+</div>
+'''
+
+_TOC_START = '''
+<nav class="toc">
+    <h2 class="toc-title">Índice</h2>
+    <ul class="toc-list">
+'''
+
+_TOC_END = '''    </ul>
+</nav>
+'''
 
 
 class HTMLGenerator:
-    """Gera HTML profissional estilo documentação médica"""
+    """Gera HTML profissional estilo documentação médica
+    
+    A mesma instância pode ser reutilizada para vários documentos: o estado
+    por documento (TOC) é zerado a cada chamada de generate(). Não é
+    thread-safe; use uma instância por thread.
+    
+    Com workers > 1, documentos com PAGE_PARALLEL_MIN_PAGES páginas ou mais
+    têm as páginas geradas em processos separados.
+    """
+    
+    # CSS montado por combinação de opções (compartilhado entre instâncias)
+    _css_cache: Dict[tuple, str] = {}
     
     def __init__(self, theme='neumorphic_dark', include_toc=True, responsive=True, 
-                 animations=True, dark_mode=False):
+                 animations=True, dark_mode=False, workers=1):
         self.theme = theme
         self.include_toc = include_toc
         self.responsive = responsive
         self.animations = animations
         self.dark_mode = dark_mode
+        self.workers = workers
+        self.toc_items = []
+        
+        # Slug por texto de título (função pura: vale entre documentos)
+        self._id_cache = {}
+        # IDs já emitidos no documento atual e próximo sufixo a tentar por slug
+        self._used_ids = set()
+        self._slug_counts = {}
+        # IDs de título já atribuídos (processos de _render_page_range): quando
+        # definido, _generate_id consome daqui em vez de gerar
+        self._id_source: Optional[Iterator[str]] = None
+        
+        # Tipo de zona -> gerador (tipos desconhecidos viram parágrafo)
+        self._zone_dispatch = {
+            'title': self._generate_title,
+            'list': self._generate_list,
+            'card': self._generate_card,
+            'table_like': self._generate_grid,
+            'paragraph': self._generate_paragraph
+        }
+    
+    def reset(self):
+        """Descarta o estado do documento anterior"""
         self.toc_items = []
+        self._used_ids = set()
+        self._slug_counts = {}
     
     def generate(self, pages_data: List[Dict]) -> str:
         """Gera HTML completo"""
+        buf = io.StringIO()
+        self.generate_to(pages_data, buf)
+        return buf.getvalue()
+    
+    def generate_to(self, pages_data: List[Dict], fp, encoding: Optional[str] = None) -> int:
+        """Escreve o HTML completo diretamente em fp (arquivo, resposta HTTP...)
+        
+        Evita manter o documento inteiro em memória: cada parte é escrita
+        assim que gerada. Com `encoding`, cada parte é codificada e fp deve
+        estar em modo binário (sem a tradução de fim de linha do modo texto).
+        
+        Retorna o total escrito (caracteres, ou bytes quando há `encoding`).
+        """
+        write = fp.write
+        total = 0
+        if encoding is None:
+            for chunk in self.iter_generate(pages_data):
+                write(chunk)
+                total += len(chunk)
+        else:
+            for chunk in self.iter_generate(pages_data):
+                data = chunk.encode(encoding)
+                write(data)
+                total += len(data)
+        return total
+    
+    def iter_generate(self, pages_data: List[Dict]) -> Iterator[str]:
+        """Gera o HTML em partes (cabeçalho, páginas, rodapé) para escrita em streaming
         
-        # Reseta TOC
-        self.toc_items = []
+        Renderização em duas fases: as páginas são geradas primeiro (preenchendo
+        self.toc_items) e só então o documento é emitido em ordem, com o TOC já
+        na posição final. Não há placeholder nem replace sobre o documento.
+        """
         
-        html_parts = [
-            '<!DOCTYPE html>',
-            '<html lang="pt-BR">',
-            '<head>',
-            '    <meta charset="UTF-8">',
-            '    <meta name="viewport" content="width=device-width, initial-scale=1.0">',
-            '    <title>Psicofármacos na Prática - Guia Profissional</title>',
-            self._generate_css(),
-            '</head>',
-            '<body>'
-        ]
+        # Reseta TOC
+        self.reset()
         
-        # Header
-        html_parts.append(self._generate_header())
+        # Fase 1: páginas (o TOC vem antes do conteúdo e depende dos títulos)
+        workers = min(self.workers, len(pages_data))
+        if workers > 1 and len(pages_data) >= PAGE_PARALLEL_MIN_PAGES:
+            pages_html = self._process_pages_parallel(pages_data, workers)
+        else:
+            process_page = self._process_page
+            pages_html = [process_page(page_data) for page_data in pages_data]
         
-        # Container principal
-        html_parts.append('<div class="main-container">')
+        # Fase 2: documento na ordem final
+        yield _PROLOGUE_HEAD
+        yield self._generate_css()
+        yield _PROLOGUE_TAIL
         
         # Sidebar com TOC (se habilitado)
         if self.include_toc:
-            html_parts.append('<aside class="sidebar">')
-            html_parts.append(self._generate_toc_placeholder())
-            html_parts.append('</aside>')
+            yield f'<aside class="sidebar">\n{self._generate_toc()}\n</aside>\n'
         
         # Conteúdo principal
-        html_parts.append('<main class="content">')
+        yield '<main class="content">\n'
         
-        # Processa páginas
-        for page_data in pages_data:
-            html_parts.append(self._process_page(page_data))
+        # Páginas, uma a uma
+        for page_html in pages_html:
+            yield page_html + '\n'
         
-        html_parts.append('</main>')
-        html_parts.append('</div>')
-        
-        # Footer
-        html_parts.append(self._generate_footer())
-        
-        # Scripts
-        html_parts.append(self._generate_scripts())
+        # Footer e scripts
+        yield _EPILOGUE
+    
+    def _process_pages_parallel(self, pages_data: List[Dict], workers: int) -> List[str]:
+        """Gera as páginas em processos separados, um intervalo contíguo por processo
+        
+        Os IDs dos títulos dependem da ordem do documento (sufixos -2, -3...),
+        então são atribuídos antes, em sequência, e enviados aos workers.
+        """
+        title_ids = [self._assign_title_ids(page_data) for page_data in pages_data]
+        
+        options = {
+            'theme': self.theme,
+            'include_toc': self.include_toc,
+            'responsive': self.responsive,
+            'animations': self.animations,
+            'dark_mode': self.dark_mode
+        }
+        step = -(-len(pages_data) // workers)
+        ranges = [
+            (options, pages_data[start:start + step], title_ids[start:start + step])
+            for start in range(0, len(pages_data), step)
+        ]
         
-        html_parts.extend(['</body>', '</html>'])
+        pages_html = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for part_html, part_toc in executor.map(_render_page_range, ranges):
+                pages_html.extend(part_html)
+                self.toc_items.extend(part_toc)
         
-        # Pós-processamento: adiciona TOC real
-        html = '\n'.join(html_parts)
-        if self.include_toc:
-            html = html.replace('<!-- TOC_PLACEHOLDER -->', self._generate_toc())
+        return pages_html
+    
+    def _assign_title_ids(self, page_data: Dict) -> List[str]:
+        """IDs dos títulos de uma página, na ordem em que _process_page os gera"""
+        generate_id = self._generate_id
+        return [
+            generate_id(zone['text'].strip())
+            for zone_type, zone in self._rendered_zones(page_data.get('zones') or ())
+            if zone_type == 'title'
+        ]
+    
+    @staticmethod
+    def _rendered_zones(zones) -> Iterator[Tuple[str, Dict]]:
+        """(tipo, zona) de cada zona que gera marcação, na ordem da página
         
-        return html
+        Usado por _process_page e por _assign_title_ids: os dois percorrem os
+        mesmos títulos, então os IDs atribuídos antes batem com os consumidos.
+        """
+        for zone in zones:
+            zone_type = zone.get('type', 'paragraph')
+            
+            # Zonas sem texto só geram marcação vazia (o grid usa os blocos)
+            if zone_type != 'table_like' and not zone.get('text', '').strip():
+                continue
+            
+            yield zone_type, zone
     
     def _process_page(self, page_data: Dict) -> str:
         """Processa uma página completa"""
-        html_parts = [f'<article class="page" data-page="{page_data["page"]}">']
+        page_num = page_data['page']
+        zones = page_data.get('zones') or ()
+        tables = page_data.get('tables') or ()
         
-        zones = page_data.get('zones', [])
-        tables = page_data.get('tables', [])
-        images = page_data.get('images', [])
+        html_parts = [f'<article class="page" data-page="{page_num}">']
+        append = html_parts.append
         
         # Se tem tabelas, processa com prioridade
-        if tables:
-            for table in tables:
-                html_parts.append(self._generate_table(table, page_data['page']))
+        generate_table = self._generate_table
+        for table in tables:
+            append(generate_table(table, page_num))
         
         # Processa zonas de conteúdo
-        for zone in zones:
-            zone_type = zone.get('type', 'paragraph')
-            
-            if zone_type == 'title':
-                html_parts.append(self._generate_title(zone))
-            elif zone_type == 'list':
-                html_parts.append(self._generate_list(zone))
-            elif zone_type == 'card':
-                html_parts.append(self._generate_card(zone))
-            elif zone_type == 'table_like':
-                html_parts.append(self._generate_grid(zone))
-            else:
-                html_parts.append(self._generate_paragraph(zone))
-        
-        html_parts.append('</article>')
+        dispatch = self._zone_dispatch
+        default = self._generate_paragraph
+        
+        for zone_type, zone in self._rendered_zones(zones):
+            append(dispatch.get(zone_type, default)(zone))
+        
+        append('</article>')
         
         return '\n'.join(html_parts)
     
@@ -130,7 +334,7 @@ class HTMLGenerator:
         
         return f'''
 <div class="section-header">
-    <h{level} class="section-title" id="{toc_id}">{text}</h{level}>
+    <h{level} class="section-title" id="{toc_id}">{_esc(text)}</h{level}>
 </div>
 '''
     
@@ -141,41 +345,32 @@ class HTMLGenerator:
         if not text:
             return ''
         
-        # Divide em parágrafos se tiver múltiplas linhas
-        paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
+        # Divide em parágrafos se tiver múltiplas linhas (um strip por trecho)
+        paragraphs = [p for p in map(str.strip, text.split('\n\n')) if p]
         
-        html = '<div class="text-block">\n'
+        parts = ['<div class="text-block">\n']
+        append = parts.append
         for para in paragraphs:
-            html += f'    <p>{para}</p>\n'
-        html += '</div>\n'
+            append(f'    <p>{_esc(para)}</p>\n')
+        append('</div>\n')
         
-        return html
+        return ''.join(parts)
     
     def _generate_list(self, zone: Dict) -> str:
         """Gera lista com marcadores"""
-        text = zone['text']
-        items = []
-        
-        # Extrai itens
-        for line in text.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Remove marcadores
-            clean = re.sub(r'^[•\-→▪◦]\s*', '', line)
-            if clean:
-                items.append(clean)
+        # Extrai itens (linhas vazias e marcadores soltos são descartados)
+        items = [item for item in _LIST_ITEMS.findall(zone['text']) if item]
         
         if not items:
             return ''
         
-        html = '<div class="list-block">\n    <ul class="styled-list">\n'
+        parts = ['<div class="list-block">\n    <ul class="styled-list">\n']
+        append = parts.append
         for item in items:
-            html += f'        <li>{item}</li>\n'
-        html += '    </ul>\n</div>\n'
+            append(f'        <li>{_esc(item)}</li>\n')
+        append('    </ul>\n</div>\n')
         
-        return html
+        return ''.join(parts)
     
     def _generate_card(self, zone: Dict) -> str:
         """Gera card destacado"""
@@ -188,8 +383,8 @@ class HTMLGenerator:
         
         return f'''
 <div class="info-card">
-    <div class="card-title">{title}</div>
-    <div class="card-content">{content}</div>
+    <div class="card-title">{_esc(title)}</div>
+    <div class="card-content">{_esc(content)}</div>
 </div>
 '''
     
@@ -197,16 +392,17 @@ class HTMLGenerator:
         """Gera grid de informações"""
         blocks = zone.get('blocks', [])
         
-        html = '<div class="info-grid">\n'
+        parts = ['<div class="info-grid">\n']
+        append = parts.append
         
         for block in blocks:
             text = block['text'].strip()
             if text:
-                html += f'    <div class="grid-item">{text}</div>\n'
+                append(f'    <div class="grid-item">{_esc(text)}</div>\n')
         
-        html += '</div>\n'
+        append('</div>\n')
         
-        return html
+        return ''.join(parts)
     
     def _generate_table(self, table: Dict, page_num: int) -> str:
         """Gera tabela profissional"""
@@ -219,43 +415,105 @@ class HTMLGenerator:
         # ID único para tabela
         table_id = f"table-p{page_num}"
         
-        html = f'''
+        header_row = _render_header(headers)
+        body_rows = _render_body(rows)
+        
+        return f'''
 <div class="table-container">
     <div class="table-wrapper">
         <table class="data-table" id="{table_id}">
             <thead>
                 <tr>
-'''
-        
-        # Cabeçalhos
-        for header in headers:
-            header_text = str(header).strip()
-            html += f'                    <th>{header_text}</th>\n'
-        
-        html += '''                </tr>
-            </thead>
-            <tbody>
-'''
-        
-        # Linhas
-        for row in rows:
-            html += '                <tr>\n'
-            for cell in row:
-                cell_text = str(cell).strip()
-                html += f'                    <td>{cell_text}</td>\n'
-            html += '                </tr>\n'
-        
-        html += '''            </tbody>
-        </table>
-    </div>
-</div>
-'''
-        
-        return html
+{header_row}{_TABLE_HEAD_END}{body_rows}{_TABLE_END}'''
     
     def _generate_header(self) -> str:
         """Gera cabeçalho da página"""
-        return '''
+        return _HEADER
+    
+    def _generate_footer(self) -> str:
+        """Gera rodapé"""
+        return _FOOTER
+    
+    def _generate_toc(self) -> str:
+        """Gera índice navegável"""
+        rows = ''.join(
+            f'        <li class="toc-level-{item["level"]}">'
+            f'<a href="#{item["id"]}">{_esc(item["text"])}</a></li>\n'
+            for item in self.toc_items
+        )
+        
+        return _TOC_START + rows + _TOC_END
+    
+    def _generate_id(self, text: str) -> str:
+        """Gera ID único a partir de texto"""
+        if self._id_source is not None:
+            return next(self._id_source)
+        
+        slug = self._id_cache.get(text)
+        if slug is None:
+            # Remove caracteres especiais e espaços
+            slug = _ID_STRIP.sub('', text.lower())
+            slug = _ID_DASH.sub('-', slug)
+            slug = self._id_cache[text] = slug[:50]  # Limita tamanho
+        
+        # Títulos repetidos recebem sufixo para que as âncoras do TOC não colidam.
+        # Os sufixos abaixo de _slug_counts[slug] já estão em uso: a busca continua
+        # de onde parou, sem reexaminar -2, -3... a cada repetição
+        used_ids = self._used_ids
+        toc_id = slug
+        if toc_id in used_ids:
+            suffix = self._slug_counts.get(slug, 2)
+            toc_id = f"{slug}-{suffix}"
+            while toc_id in used_ids:
+                suffix += 1
+                toc_id = f"{slug}-{suffix}"
+            self._slug_counts[slug] = suffix + 1
+        
+        used_ids.add(toc_id)
+        return toc_id
+    
+    def _generate_css(self) -> str:
+        """Gera CSS com tema Neumórfico Dark, só com os blocos das opções ativas"""
+        key = (self.responsive, self.animations)
+        css = self._css_cache.get(key)
+        if css is None:
+            pieces = [_CSS_BASE, _CSS_PRINT]
+            if self.responsive:
+                pieces.append(_CSS_RESPONSIVE)
+            if self.animations:
+                pieces.append(_CSS_ANIMATIONS)
+            pieces.append(_CSS_END)
+            css = self._css_cache[key] = ''.join(pieces)
+        return css
+    
+    def _generate_scripts(self) -> str:
+        """Gera scripts JavaScript"""
+        return _SCRIPTS
+
+
+def _render_page_range(args):
+    """Gera um intervalo de páginas em processo separado (função de módulo para pickle)
+    
+    Retorna o HTML de cada página e os itens de TOC do intervalo, em ordem.
+    """
+    options, pages_data, title_ids = args
+    generator = HTMLGenerator(**options)
+    
+    pages_html = []
+    for page_data, page_ids in zip(pages_data, title_ids):
+        # IDs já atribuídos pelo processo principal, consumidos na ordem dos títulos
+        generator._id_source = iter(page_ids)
+        pages_html.append(generator._process_page(page_data))
+    generator._id_source = None
+    
+    return pages_html, generator.toc_items
+
+
+# ============================================
+# Recursos estáticos (montados uma vez, na importação do módulo)
+# ============================================
+
+_HEADER = '''
 <header class="page-header">
     <div class="header-content">
         <div class="logo-section">
@@ -273,10 +531,8 @@ class HTMLGenerator:
     </div>
 </header>
 '''
-    
-    def _generate_footer(self) -> str:
-        """Gera rodapé"""
-        return '''
+
+_FOOTER = '''
 <footer class="page-footer">
     <div class="footer-content">
         <p>NPG | Neuropsiquiatria Geriátrica | @neuropsigeri</p>
@@ -284,41 +540,8 @@ class HTMLGenerator:
     </div>
 </footer>
 '''
-    
-    def _generate_toc_placeholder(self) -> str:
-        """Gera placeholder para TOC"""
-        return '<!-- TOC_PLACEHOLDER -->'
-    
-    def _generate_toc(self) -> str:
-        """Gera índice navegável"""
-        html = '''
-<nav class="toc">
-    <h2 class="toc-title">Índice</h2>
-    <ul class="toc-list">
-'''
-        
-        for item in self.toc_items:
-            indent = 'toc-level-' + str(item['level'])
-            html += f'        <li class="{indent}">'
-            html += f'<a href="#{item["id"]}">{item["text"]}</a></li>\n'
-        
-        html += '''    </ul>
-</nav>
-'''
-        
-        return html
-    
-    def _generate_id(self, text: str) -> str:
-        """Gera ID único a partir de texto"""
-        # Remove caracteres especiais e espaços
-        id_text = re.sub(r'[^\w\s-]', '', text.lower())
-        id_text = re.sub(r'[-\s]+', '-', id_text)
-        return id_text[:50]  # Limita tamanho
-    
-    def _generate_css(self) -> str:
-        """Gera CSS completo com tema Neumórfico Dark"""
-        
-        return """
+
+_CSS_BASE = """
     <style>
         @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&family=JetBrains+Mono:wght@400;500;600&display=swap');
         
@@ -818,7 +1041,9 @@ class HTMLGenerator:
             background: var(--neon-blue);
             color: var(--bg-base);
         }
-        
+"""
+
+_CSS_PRINT = """
         /* Print Styles */
         @media print {
             body {
@@ -847,7 +1072,9 @@ class HTMLGenerator:
                 margin-bottom: 20px;
             }
         }
-        
+"""
+
+_CSS_RESPONSIVE = """
         /* Responsive */
         @media (max-width: 1024px) {
             .sidebar {
@@ -898,7 +1125,9 @@ class HTMLGenerator:
                 padding: 8px 10px;
             }
         }
-        
+"""
+
+_CSS_ANIMATIONS = """
         /* Animações */
         @keyframes fadeIn {
             from {
@@ -927,12 +1156,12 @@ class HTMLGenerator:
         .logo-text h1 {
             animation: glow 3s ease-in-out infinite;
         }
-    </style>
 """
-    
-    def _generate_scripts(self) -> str:
-        """Gera scripts JavaScript"""
-        return '''
+
+_CSS_END = """    </style>
+"""
+
+_SCRIPTS = '''
     <script>
         // Highlight TOC item atual
         function updateTOC() {
@@ -1003,3 +1232,36 @@ class HTMLGenerator:
         });
     </script>
 '''
+
+# A fonte acima fica legível; o HTML emitido leva a versão minificada
+_CSS_BASE, _CSS_PRINT, _CSS_RESPONSIVE, _CSS_ANIMATIONS, _CSS_END = map(
+    _minify_css, (_CSS_BASE, _CSS_PRINT, _CSS_RESPONSIVE, _CSS_ANIMATIONS, _CSS_END)
+)
+_SCRIPTS = _minify_js(_SCRIPTS)
+
+# Tudo o que vem antes do TOC e depois do conteúdo é fixo (exceto o CSS,
+# que depende das opções): uma escrita cada
+_PROLOGUE_HEAD = '\n'.join([
+    '<!DOCTYPE html>',
+    '<html lang="pt-BR">',
+    '<head>',
+    '    <meta charset="UTF-8">',
+    '    <meta name="viewport" content="width=device-width, initial-scale=1.0">',
+    '    <title>Psicofármacos na Prática - Guia Profissional</title>',
+]) + '\n'
+
+_PROLOGUE_TAIL = '\n' + '\n'.join([
+    '</head>',
+    '<body>',
+    _HEADER,
+    '<div class="main-container">',
+]) + '\n'
+
+_EPILOGUE = '\n'.join([
+    '</main>',
+    '</div>',
+    _FOOTER,
+    _SCRIPTS,
+    '</body>',
+    '</html>',
+])
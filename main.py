@@ -5,21 +5,29 @@ Versão: 4.0 - Neumorphic Dark + AI Analysis
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
+import functools
+import multiprocessing
+import os
 import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import json
-import webbrowser
 
-# Importar módulos avançados - CORRIGIDO
-from pdf_extractor import AdvancedPDFExtractor  # Mudado de PDFExtractor
-from html_generator import HTMLGenerator
+# Extrator (PyMuPDF, pdfplumber...) e gerador são importados só quando usados,
+# nas threads de trabalho: a janela abre sem esperar as bibliotecas de PDF
+from batch_converter import default_workers
 
 try:
     from config_manager import ConfigManager
 except ImportError:
     # Fallback simples se não existir
     class ConfigManager:
+        HISTORY_LIMIT = 50
+        
         def __init__(self):
             self.config_file = Path("config.json")
             self.history_file = Path("history.json")
@@ -37,15 +45,163 @@ except ImportError:
             history.append(entry)
             self.history_file.write_text(json.dumps(history, indent=2))
         
+        # Sem write-behind no fallback: grava na hora
+        enqueue_history = save_to_history
+        
         def get_history(self):
             if self.history_file.exists():
                 return json.loads(self.history_file.read_text())
             return []
+        
+        def get_recent(self, n=10):
+            return self.get_history()[::-1][:n]
+        
+        def get_last_output(self):
+            history = self.get_history()
+            return history[-1]['output'] if history else None
+
+
+# Quantidade de extrações mantidas em memória entre análise/geração/conversão
+EXTRACT_CACHE_SIZE = 4
+
+# Log em write-behind: intervalo de descarga (ms) e máximo de mensagens por descarga
+LOG_FLUSH_MS = 50
+LOG_FLUSH_BATCH = 200
+# Máximo de caracteres por inserção: textos enormes são inseridos em partes
+LOG_FLUSH_MAX_CHARS = 8192
+# Buffer circular: mensagens pendentes além disso descartam as mais antigas
+LOG_QUEUE_MAX = 5000
+# Linhas mantidas no widget de log (as mais antigas são removidas)
+LOG_MAX_LINES = 5000
+
+# Intervalo mínimo entre atualizações do progresso na tela (ms): ~20 por segundo
+PROGRESS_INTERVAL_MS = 50
+
+# Limites do relato de erros no log (tracebacks de bibliotecas de PDF são enormes)
+TRACEBACK_MAX_LINES = 40
+ERROR_MSG_MAX_CHARS = 500
+
+# Entradas listadas na janela de histórico: as mesmas que o ConfigManager mantém
+# (contagem estável e servida do cache em memória)
+HISTORY_WINDOW_SIZE = ConfigManager.HISTORY_LIMIT
+
+# Separador das seções do log
+_BANNER = "=" * 70
+
+# Cards de status ao fim da geração do HTML e da conversão completa
+_HTML_STATUS_MSG = (
+    "✅ HTML GERADO!\n\n"
+    "📄 {name}\n"
+    "💾 {kb:.2f} KB\n\n"
+    "📂 {parent}\n\n"
+    "🎨 Tema: {theme}"
+)
+_CONVERSION_STATUS_MSG = (
+    "✅ CONVERSÃO CONCLUÍDA!\n\n"
+    "📄 {name}\n"
+    "💾 {kb:.2f} KB\n\n"
+    "📊 Estatísticas:\n"
+    "  • {pages} páginas\n"
+    "  • {zones} zonas\n"
+    "  • {tables} tabelas\n"
+    "  • {images} imagens\n\n"
+    "🎨 Tema: {theme}"
+)
+
+# Textos dos diálogos de sucesso: só nome e pasta do arquivo são formatados
+_HTML_SUCCESS_MSG = (
+    "HTML criado com sucesso!\n\n"
+    "📄 {name}\n"
+    "📂 {parent}\n\n"
+    "Abrir no navegador?"
+)
+_COMPLETION_MSG = (
+    "Conversão concluída!\n\n"
+    "📄 {name}\n"
+    "📁 {parent}\n\n"
+    "Recursos:\n"
+    "✨ Design neumórfico dark\n"
+    "🎯 Análise com IA\n"
+    "📱 Responsivo\n"
+    "🖨️ Pronto para impressão\n\n"
+    "Abrir agora?"
+)
+
+
+def _describe_error(error: Exception) -> str:
+    """Mensagem curta do erro: tipo (quando não é Exception genérica) + texto limitado"""
+    message = str(error)
+    if len(message) > ERROR_MSG_MAX_CHARS:
+        message = message[:ERROR_MSG_MAX_CHARS] + "…"
+    if type(error) is Exception:
+        return message
+    return f"{type(error).__name__}: {message}"
+
+
+def _format_traceback() -> str:
+    """Traceback da exceção atual, só com as últimas TRACEBACK_MAX_LINES linhas"""
+    lines = traceback.format_exc().splitlines()
+    if len(lines) > TRACEBACK_MAX_LINES:
+        lines = ["…"] + lines[-TRACEBACK_MAX_LINES:]
+    return "\n".join(lines)
+
+
+@functools.lru_cache(maxsize=128)
+def _history_labels(timestamp: str, input_path: str) -> tuple:
+    """(data formatada, nome do PDF) de uma entrada do histórico, memoizados"""
+    return (datetime.fromisoformat(timestamp).strftime("%d/%m/%Y %H:%M"),
+            Path(input_path).name)
 
 
 class ModernPDFConverterApp:
     """Aplicação avançada com IA e design moderno"""
     
+    # Cores tema escuro
+    COLORS = {
+        'bg': '#1a1d29',
+        'fg': '#e8edf4',
+        'accent': '#00d4ff',
+        'success': '#10b981',
+        'warning': '#f59e0b',
+        'error': '#ef4444',
+        'surface': '#1f2233'
+    }
+    
+    # Estilos ttk (nome, opções), montados uma vez na definição da classe
+    _STYLE_SPECS = (
+        ('TFrame', {'background': COLORS['bg']}),
+        ('TLabel', {'background': COLORS['bg'], 'foreground': COLORS['fg']}),
+        ('Title.TLabel', {'background': COLORS['bg'],
+                          'foreground': COLORS['accent'],
+                          'font': ('Segoe UI', 18, 'bold')}),
+        ('Header.TLabel', {'background': COLORS['bg'],
+                           'foreground': COLORS['accent'],
+                           'font': ('Segoe UI', 11, 'bold')}),
+        ('Action.TButton', {'font': ('Segoe UI', 10, 'bold')}),
+        ('History.Treeview', {'background': COLORS['surface'],
+                              'fieldbackground': COLORS['surface'],
+                              'foreground': COLORS['fg'],
+                              'font': ('Consolas', 9)}),
+    )
+    
+    # Colunas da janela de histórico (id, título, largura)
+    _HISTORY_COLUMNS = (
+        ('ts', 'Data', 120),
+        ('file', 'Arquivo', 260),
+        ('theme', 'Tema', 100),
+        ('pages', 'Páginas', 70),
+        ('tables', 'Tabelas', 70),
+    )
+    
+    # Tags de cor do log (tag, cor do texto)
+    _LOG_TAGS = (
+        ('info', COLORS['fg']),
+        ('success', COLORS['success']),
+        ('warning', COLORS['warning']),
+        ('error', COLORS['error']),
+        ('accent', COLORS['accent']),
+    )
+    
     def __init__(self, root):
         self.root = root
         self.root.title("🚀 PDF to HTML AI Converter Pro 4.0")
@@ -55,24 +211,44 @@ class ModernPDFConverterApp:
         # Configurações
         self.config = ConfigManager()
         self.pdf_file = None
+        # stat do PDF, renovado no início de cada ação (tamanho e mtime do cache)
+        self._pdf_stat = None
         self.output_file = None
+        # (pdf, tema) -> caminho do HTML gerado
+        self._output_paths = {}
         self.is_processing = False
         self.current_analysis = None
         
+        # Extrações e análises por (arquivo, mtime, método, OCR)
+        self._extract_cache = {}
+        
+        # Escritas auxiliares (Markdown) em paralelo à escrita do HTML
+        self._io_pool = ThreadPoolExecutor(max_workers=2)
+        
+        # Mensagens de log pendentes (deque: append seguro a partir das threads)
+        self._log_queue = deque(maxlen=LOG_QUEUE_MAX)
+        # Resto de uma mensagem cortada pelo limite de caracteres, inserido primeiro
+        # na próxima descarga (fora da fila limitada: não descarta nada ao voltar)
+        self._log_carry = None
+        # Atualizações de UI vindas das threads: (função, args), executadas junto com o log
+        self._ui_queue = deque()
+        # (segundo, "HH:MM:SS"): strftime só roda quando o segundo muda
+        self._log_timestamp = (None, '')
+        
+        # Progresso: só o valor mais recente é exibido, no máximo a cada PROGRESS_INTERVAL_MS
+        # (aplicado por _flush_log, na thread do Tk)
+        self._last_progress = ('', 0.0)
+        self._progress_pending = False
+        self._progress_applied_at = 0.0
+        
         # Cores tema escuro
-        self.colors = {
-            'bg': '#1a1d29',
-            'fg': '#e8edf4',
-            'accent': '#00d4ff',
-            'success': '#10b981',
-            'warning': '#f59e0b',
-            'error': '#ef4444',
-            'surface': '#1f2233'
-        }
+        self.colors = self.COLORS
         
         self.setup_modern_ui()
         self.load_saved_settings()
         
+        self.root.after(LOG_FLUSH_MS, self._flush_log)
+        
     def setup_modern_ui(self):
         """Configura interface moderna"""
         
@@ -81,17 +257,8 @@ class ModernPDFConverterApp:
         style.theme_use('clam')
         
         # Customizar cores
-        style.configure('TFrame', background=self.colors['bg'])
-        style.configure('TLabel', background=self.colors['bg'], foreground=self.colors['fg'])
-        style.configure('Title.TLabel', 
-                       background=self.colors['bg'], 
-                       foreground=self.colors['accent'],
-                       font=('Segoe UI', 18, 'bold'))
-        style.configure('Header.TLabel', 
-                       background=self.colors['bg'],
-                       foreground=self.colors['accent'],
-                       font=('Segoe UI', 11, 'bold'))
-        style.configure('Action.TButton', font=('Segoe UI', 10, 'bold'))
+        for name, options in self._STYLE_SPECS:
+            style.configure(name, **options)
         
         self.root.configure(bg=self.colors['bg'])
         
@@ -149,7 +316,10 @@ class ModernPDFConverterApp:
         
         # Progress
         self.progress = ttk.Progressbar(right_column, mode='indeterminate')
-        self.progress.pack(fill='x', pady=10)
+        self.progress.pack(fill='x', pady=(10, 0))
+        
+        self.progress_label = ttk.Label(right_column, text='')
+        self.progress_label.pack(fill='x', pady=(0, 10))
         
         # Log
         self.setup_log_section(right_column)
@@ -245,13 +415,15 @@ class ModernPDFConverterApp:
         self.animations = tk.BooleanVar(value=True)
         self.enable_ocr = tk.BooleanVar(value=False)
         self.export_markdown = tk.BooleanVar(value=False)
+        self.parallel_extraction = tk.BooleanVar(value=True)
         
         options = [
             ("📑 Índice navegável lateral", self.include_toc),
             ("📱 Design responsivo (mobile/tablet)", self.responsive_design),
             ("✨ Animações neumórficas", self.animations),
             ("🔍 OCR para PDFs escaneados (Beta)", self.enable_ocr),
-            ("📝 Exportar também em Markdown", self.export_markdown)
+            ("📝 Exportar também em Markdown", self.export_markdown),
+            ("⚡ Paralelizar extração (PDFs grandes)", self.parallel_extraction)
         ]
         
         for text, var in options:
@@ -312,6 +484,11 @@ class ModernPDFConverterApp:
                                       '💡 Dica: Use o botão "Análise Prévia" para\n'
                                       'visualizar a estrutura antes da conversão.')
         self.status_text.config(state='disabled')
+        
+        # Métodos do widget resolvidos uma vez (usados por update_status)
+        self._status_insert = self.status_text.insert
+        self._status_delete = self.status_text.delete
+        self._status_config = self.status_text.config
     
     def setup_log_section(self, parent):
         """Seção de log"""
@@ -338,28 +515,251 @@ class ModernPDFConverterApp:
         scrollbar.config(command=self.log_text.yview)
         
         # Tags para cores
-        self.log_text.tag_config('info', foreground=self.colors['fg'])
-        self.log_text.tag_config('success', foreground=self.colors['success'])
-        self.log_text.tag_config('warning', foreground=self.colors['warning'])
-        self.log_text.tag_config('error', foreground=self.colors['error'])
-        self.log_text.tag_config('accent', foreground=self.colors['accent'])
+        for tag, color in self._LOG_TAGS:
+            self.log_text.tag_config(tag, foreground=color)
+        
+        # Métodos do widget resolvidos uma vez (usados a cada descarga do log)
+        self._log_insert = self.log_text.insert
+        self._log_see = self.log_text.see
+        self._log_delete = self.log_text.delete
+        self._log_config = self.log_text.config
     
     def log(self, message, level="info"):
-        """Adiciona mensagem ao log com cores"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.config(state='normal')
-        self.log_text.insert(tk.END, f"[{timestamp}] ", 'info')
-        self.log_text.insert(tk.END, f"{message}\n", level)
-        self.log_text.see(tk.END)
-        self.log_text.config(state='disabled')
-        self.root.update()
+        """Enfileira mensagem para o log (escrita no widget feita por _flush_log)"""
+        now = int(time.time())
+        second, timestamp = self._log_timestamp
+        if second != now:
+            timestamp = time.strftime("%H:%M:%S", time.localtime(now))
+            # Tupla trocada de uma vez: seguro com várias threads registrando
+            self._log_timestamp = (now, timestamp)
+        self._log_queue.append((timestamp, message, level))
+    
+    def _flush_log(self):
+        """Descarrega as mensagens pendentes no widget de log, em uma única inserção"""
+        queue = self._log_queue
+        carry = self._log_carry
+        
+        if queue or carry is not None:
+            self._log_carry = None
+            
+            # Pares (texto, tag); trechos seguidos com a mesma tag viram um só
+            chunks = []
+            tags = []
+            budget = LOG_FLUSH_MAX_CHARS
+            count = 0
+            while (carry is not None or queue) and count < LOG_FLUSH_BATCH and budget > 0:
+                if carry is not None:
+                    timestamp, message, level = carry
+                    carry = None
+                else:
+                    timestamp, message, level = queue.popleft()
+                count += 1
+                
+                if len(message) > budget:
+                    # O restante (sem novo horário) sai primeiro na próxima
+                    # descarga, depois de um redesenho
+                    self._log_carry = (None, message[budget:], level)
+                    message = message[:budget]
+                    end = ""
+                else:
+                    end = "\n"
+                budget -= len(message)
+                
+                prefix = f"[{timestamp}] " if timestamp is not None else ""
+                for text, tag in ((prefix, 'info'), (message + end, level)):
+                    if not text:
+                        continue
+                    if tags and tags[-1] == tag:
+                        chunks[-1] += text
+                    else:
+                        chunks.append(text)
+                        tags.append(tag)
+            
+            args = []
+            for text, tag in zip(chunks, tags):
+                args.append(text)
+                args.append(tag)
+            
+            self._log_config(state='normal')
+            self._log_insert(tk.END, *args)
+            # Widget limitado: inserir e rolar não ficam mais lentos com o tempo
+            self._log_delete('1.0', f'end - {LOG_MAX_LINES} lines')
+            self._log_see(tk.END)
+            self._log_config(state='disabled')
+            # Só redesenho pendente (sem eventos do usuário): com a fila cheia as
+            # descargas se encadeiam a cada 1 ms e o Tk não chegaria a ficar ocioso
+            self.log_text.update_idletasks()
+        
+        # Ainda há fila acumulada: descarrega de novo assim que possível
+        self.root.after(1 if queue or self._log_carry is not None else LOG_FLUSH_MS,
+                        self._flush_log)
+        
+        # Progresso registrado pelas threads desde o último tick
+        if self._progress_pending:
+            now = time.monotonic()
+            if now - self._progress_applied_at >= PROGRESS_INTERVAL_MS / 1000:
+                self._progress_applied_at = now
+                self._apply_progress()
+        
+        # Depois do log (o diálogo final já encontra as mensagens no widget). O
+        # próximo tick já está agendado: um diálogo modal aqui não trava o log
+        ui_queue = self._ui_queue
+        while ui_queue:
+            func, args = ui_queue.popleft()
+            func(*args)
+    
+    def _post_ui(self, func, *args):
+        """Agenda func(*args) na thread do Tk, no próximo tick de _flush_log"""
+        self._ui_queue.append((func, args))
+    
+    def _finish_processing(self):
+        """Para a barra de progresso e reabilita os botões ao fim de uma tarefa"""
+        self.progress.stop()
+        self.convert_btn.config(state='normal')
+        self.analyze_btn.config(state='normal')
+        self.generate_html_btn.config(state='normal')
+    
+    def _report_progress(self, stage, value):
+        """Registra o progresso (chamado pelas threads, sem tocar no Tk)
+        
+        Só guarda o valor mais recente; _flush_log o exibe no próximo tick.
+        """
+        self._last_progress = (stage, value)
+        self._progress_pending = True
+    
+    def _apply_progress(self):
+        """Exibe o progresso mais recente no rótulo abaixo da barra"""
+        self._progress_pending = False
+        stage, value = self._last_progress
+        self.progress_label.config(text=f"{stage}: {int(value * 100)}%")
     
     def update_status(self, text):
         """Atualiza card de status"""
-        self.status_text.config(state='normal')
-        self.status_text.delete('1.0', tk.END)
-        self.status_text.insert('1.0', text)
-        self.status_text.config(state='disabled')
+        config = self._status_config
+        config(state='normal')
+        self._status_delete('1.0', tk.END)
+        self._status_insert('1.0', text)
+        config(state='disabled')
+    
+    def _extraction_key(self, extractor):
+        """Chave de cache da extração: o arquivo alterado no disco invalida a entrada"""
+        return (str(self.pdf_file), self._pdf_stat.st_mtime_ns,
+                extractor.method, extractor.enable_ocr)
+    
+    def _snapshot_options(self):
+        """Lê todas as opções da interface de uma vez (na thread principal)
+        
+        As threads de trabalho usam só esta cópia: mudar uma opção durante o
+        processamento não afeta a conversão em andamento.
+        """
+        method = self.extraction_method.get()
+        return {
+            'method': method,
+            # Nome de método da interface -> método do extrator
+            'extract_method': {'advanced': 'auto', 'fast': 'pymupdf'}.get(method, method),
+            'theme': self.design_theme.get(),
+            'toc': self.include_toc.get(),
+            'responsive': self.responsive_design.get(),
+            'animations': self.animations.get(),
+            'ocr': self.enable_ocr.get(),
+            'markdown': self.export_markdown.get(),
+            'parallel': self.parallel_extraction.get()
+        }
+    
+    def _get_pages_data(self, extractor, opts):
+        """Extrai o PDF atual, reaproveitando a extração anterior com as mesmas opções"""
+        key = self._extraction_key(extractor)
+        entry = self._extract_cache.get(key)
+        
+        if entry is not None:
+            self.log(f"📋 Usando dados em cache: {len(entry['pages_data'])} páginas", "info")
+            return entry['pages_data']
+        
+        # Em paralelo só com a opção ativa; extract_parallel volta ao modo
+        # sequencial sozinho em PDFs pequenos (PAGE_PARALLEL_MIN_PAGES)
+        if opts['parallel']:
+            pages_data = extractor.extract_parallel(self.pdf_file, default_workers())
+        else:
+            pages_data = extractor.extract(self.pdf_file)
+        
+        # Mantém só as extrações mais recentes (pages_data pode ser grande)
+        while len(self._extract_cache) >= EXTRACT_CACHE_SIZE:
+            del self._extract_cache[next(iter(self._extract_cache))]
+        
+        self._extract_cache[key] = {'pages_data': pages_data, 'analysis': None}
+        return pages_data
+    
+    def _get_analysis(self, extractor, pages_data):
+        """Análise estrutural do PDF atual, calculada uma vez por extração"""
+        entry = self._extract_cache.get(self._extraction_key(extractor))
+        
+        if entry is None or entry['pages_data'] is not pages_data:
+            return extractor.analyze_document_structure(pages_data)
+        
+        if entry['analysis'] is None:
+            entry['analysis'] = extractor.analyze_document_structure(pages_data)
+        return entry['analysis']
+    
+    def _start_markdown_export(self, extractor, pages_data, output_path, opts):
+        """Agenda a exportação Markdown (se habilitada) para rodar junto com a escrita do HTML"""
+        if not opts['markdown']:
+            return None
+        
+        self.log("\n📝 Exportando Markdown em paralelo...", "info")
+        md_path = output_path.with_suffix('.md')
+        return md_path, self._io_pool.submit(extractor.export_markdown, pages_data, md_path)
+    
+    def _finish_markdown_export(self, markdown_job):
+        """Aguarda a exportação Markdown agendada e registra o resultado"""
+        if markdown_job is None:
+            return
+        
+        md_path, future = markdown_job
+        try:
+            future.result()
+            self.log(f"   ✅ Markdown salvo: {md_path.name}", "success")
+        except Exception as md_error:
+            self.log(f"   ⚠ Erro no Markdown: {md_error}", "warning")
+    
+    def _output_path(self, theme_name):
+        """Arquivo de saída: '<pdf>_<tema>.html' na pasta do próprio PDF
+        
+        A pasta já existe (é a do PDF), então não há mkdir antes de salvar.
+        """
+        key = (self.pdf_file, theme_name)
+        path = self._output_paths.get(key)
+        if path is None:
+            path = self._output_paths[key] = (
+                self.pdf_file.parent / f"{self.pdf_file.stem}_{theme_name}.html"
+            )
+        return path
+    
+    def _save_html(self, generator, pages_data, output_path):
+        """Grava o HTML em streaming num temporário e publica com os.replace (atômico)
+        
+        Retorna o tamanho em bytes; o arquivo final nunca fica pela metade.
+        """
+        tmp_path = output_path.with_suffix(output_path.suffix + '.tmp')
+        try:
+            with open(tmp_path, 'wb', buffering=1 << 20) as f:
+                size = generator.generate_to(pages_data, f, encoding='utf-8')
+            os.replace(tmp_path, output_path)
+        finally:
+            # Só sobra se a escrita falhou
+            try:
+                tmp_path.unlink()
+            except FileNotFoundError:
+                pass
+        return size
+    
+    def _refresh_pdf_stat(self):
+        """Relê o stat do PDF selecionado; False se o arquivo não existe mais"""
+        try:
+            self._pdf_stat = self.pdf_file.stat()
+        except OSError:
+            messagebox.showerror("❌ Erro", f"Arquivo não encontrado:\n{self.pdf_file}")
+            return False
+        return True
     
     def select_pdf(self):
         """Seleciona arquivo PDF"""
@@ -375,7 +775,8 @@ class ModernPDFConverterApp:
             self.analyze_btn.config(state='normal')
             self.generate_html_btn.config(state='normal')
             
-            size_mb = self.pdf_file.stat().st_size / (1024 * 1024)
+            self._pdf_stat = self.pdf_file.stat()
+            size_mb = self._pdf_stat.st_size / (1024 * 1024)
             self.log(f"📄 Arquivo selecionado: {self.pdf_file.name}", "success")
             self.log(f"   Tamanho: {size_mb:.2f} MB", "info")
             
@@ -387,26 +788,27 @@ class ModernPDFConverterApp:
     
     def analyze_pdf(self):
         """Analisa PDF sem converter"""
-        if not self.pdf_file:
+        if not self.pdf_file or not self._refresh_pdf_stat():
             return
         
         self.log("🔬 Iniciando análise prévia...", "accent")
         self.progress.start(10)
         
-        thread = threading.Thread(target=self._analyze_thread)
+        thread = threading.Thread(target=self._analyze_thread, args=(self._snapshot_options(),))
         thread.daemon = True
         thread.start()
     
-    def _analyze_thread(self):
+    def _analyze_thread(self, opts):
         """Thread de análise"""
         try:
+            from pdf_extractor import AdvancedPDFExtractor
             extractor = AdvancedPDFExtractor(
                 method='auto',
                 log_callback=self.log
             )
             
-            pages_data = extractor.extract(self.pdf_file)
-            analysis = extractor.analyze_document_structure(pages_data)
+            pages_data = self._get_pages_data(extractor, opts)
+            analysis = self._get_analysis(extractor, pages_data)
             
             self.current_analysis = analysis
             
@@ -427,13 +829,13 @@ class ModernPDFConverterApp:
             result += f"  • Fonte média: {typo['avg_font_size']:.1f}pt\n"
             result += f"  • Range: {typo['min_font_size']:.1f} - {typo['max_font_size']:.1f}pt"
             
-            self.root.after(0, lambda: self.update_status(result))
+            self._post_ui(self.update_status, result)
             self.log("✅ Análise concluída!", "success")
             
         except Exception as e:
             self.log(f"❌ Erro na análise: {e}", "error")
         finally:
-            self.root.after(0, self.progress.stop)
+            self._post_ui(self.progress.stop)
     
     def generate_html_only(self):
         """Gera HTML a partir da última análise ou extrai novamente"""
@@ -445,9 +847,12 @@ class ModernPDFConverterApp:
             messagebox.showwarning("⚠ Aviso", "Aguarde o processamento atual!")
             return
         
-        self.log("\n" + "=" * 70, "accent")
+        if not self._refresh_pdf_stat():
+            return
+        
+        self.log("\n" + _BANNER, "accent")
         self.log("🎨 GERANDO HTML", "accent")
-        self.log("=" * 70, "accent")
+        self.log(_BANNER, "accent")
         
         self.is_processing = True
         self.generate_html_btn.config(state='disabled')
@@ -455,166 +860,133 @@ class ModernPDFConverterApp:
         self.convert_btn.config(state='disabled')
         self.progress.start(10)
         
-        thread = threading.Thread(target=self._generate_html_thread, daemon=True)
+        thread = threading.Thread(target=self._generate_html_thread,
+                                  args=(self._snapshot_options(),), daemon=True)
         thread.start()
     
-    def _generate_html_thread(self):
-        """Thread para gerar HTML"""
+    def _generate_html_thread(self, opts):
+        """Thread para gerar HTML (opts: cópia das opções feita por _snapshot_options)"""
+        # Chamado dezenas de vezes: resolvido uma vez só
+        log = self.log
+        
         try:
-            # Se não tem análise prévia, extrai dados
-            if not hasattr(self, 'pages_data') or not self.pages_data:
-                self.log("\n📄 Extraindo dados do PDF...", "info")
-                
-                method = self.extraction_method.get()
-                if method == 'advanced':
-                    method = 'auto'
-                elif method == 'fast':
-                    method = 'pymupdf'
-                
-                extractor = AdvancedPDFExtractor(
-                    method=method,
-                    enable_ocr=self.enable_ocr.get(),
-                    log_callback=self.log,
-                    progress_callback=lambda p: self.root.after(0, 
-                        lambda prog=p: self.update_status(f"Extraindo: {int(prog*100)}%"))
-                )
-                
-                self.pages_data = extractor.extract(self.pdf_file)
-                
-                if not self.pages_data or len(self.pages_data) == 0:
-                    raise Exception("Nenhum dado extraído do PDF")
-                
-                self.log(f"✅ Extraído: {len(self.pages_data)} páginas", "success")
-            else:
-                self.log(f"📋 Usando dados em cache: {len(self.pages_data)} páginas", "info")
+            # Extrai dados (ou reaproveita a extração anterior do mesmo arquivo)
+            log("\n📄 Extraindo dados do PDF...", "info")
+            
+            from pdf_extractor import AdvancedPDFExtractor
+            extractor = AdvancedPDFExtractor(
+                method=opts['extract_method'],
+                enable_ocr=opts['ocr'],
+                log_callback=log,
+                progress_callback=functools.partial(self._report_progress, "Extraindo")
+            )
+            
+            self.pages_data = self._get_pages_data(extractor, opts)
+            
+            if not self.pages_data or len(self.pages_data) == 0:
+                raise Exception("Nenhum dado extraído do PDF")
+            
+            log(f"✅ Extraído: {len(self.pages_data)} páginas", "success")
             
             # Log detalhado dos dados extraídos
-            self.log("\n🔍 Analisando estrutura extraída...", "info")
+            log("\n🔍 Analisando estrutura extraída...", "info")
             for i, page in enumerate(self.pages_data[:3], 1):  # Primeiras 3 páginas
-                self.log(f"   Página {i}:", "info")
-                self.log(f"      • Zonas: {len(page.get('zones', []))}", "info")
-                self.log(f"      • Tabelas: {len(page.get('tables', []))}", "info")
-                self.log(f"      • Blocos de texto: {len(page.get('text_blocks', []))}", "info")
+                log(f"   Página {i}:", "info")
+                log(f"      • Zonas: {len(page.get('zones', []))}", "info")
+                log(f"      • Tabelas: {len(page.get('tables', []))}", "info")
+                log(f"      • Blocos de texto: {len(page.get('text_blocks', []))}", "info")
             
             # Gera HTML
-            self.log("\n🎨 Criando gerador HTML...", "info")
-            self.log(f"   • Tema: {self.design_theme.get()}", "info")
-            self.log(f"   • TOC: {self.include_toc.get()}", "info")
-            self.log(f"   • Responsivo: {self.responsive_design.get()}", "info")
-            self.log(f"   • Animações: {self.animations.get()}", "info")
+            log("\n🎨 Criando gerador HTML...", "info")
+            log(f"   • Tema: {opts['theme']}", "info")
+            log(f"   • TOC: {opts['toc']}", "info")
+            log(f"   • Responsivo: {opts['responsive']}", "info")
+            log(f"   • Animações: {opts['animations']}", "info")
             
+            from html_generator import HTMLGenerator
             generator = HTMLGenerator(
-                theme=self.design_theme.get(),
-                include_toc=self.include_toc.get(),
-                responsive=self.responsive_design.get(),
-                animations=self.animations.get()
+                theme=opts['theme'],
+                include_toc=opts['toc'],
+                responsive=opts['responsive'],
+                animations=opts['animations']
             )
             
-            self.log("✅ Gerador criado", "success")
-            self.log("\n🔄 Gerando conteúdo HTML...", "info")
+            log("✅ Gerador criado", "success")
+            log("\n🔄 Gerando conteúdo HTML...", "info")
+            
+            # Salvar arquivo
+            theme_name = opts['theme']
+            output_path = self._output_path(theme_name)
             
-            html_content = generator.generate(self.pages_data)
+            log(f"\n💾 Salvando arquivo...", "accent")
+            log(f"   📂 Pasta: {output_path.parent}", "info")
+            log(f"   📄 Nome: {output_path.name}", "info")
             
-            self.log(f"✅ HTML gerado: {len(html_content):,} caracteres", "success")
+            # Markdown opcional, escrito enquanto o HTML é gerado
+            markdown_job = self._start_markdown_export(extractor, self.pages_data, output_path, opts)
             
-            if not html_content or len(html_content) < 100:
-                raise Exception(f"HTML inválido: {len(html_content) if html_content else 0} chars")
+            # Salva arquivo gerando o HTML em streaming (sem string intermediária)
+            file_size = self._save_html(generator, self.pages_data, output_path)
+            log(f"✅ HTML gerado: {file_size:,} bytes", "success")
             
-            # Salvar arquivo
-            theme_name = self.design_theme.get()
-            output_path = self.pdf_file.parent / f"{self.pdf_file.stem}_{theme_name}.html"
-            
-            self.log(f"\n💾 Salvando arquivo...", "accent")
-            self.log(f"   📂 Pasta: {output_path.parent}", "info")
-            self.log(f"   📄 Nome: {output_path.name}", "info")
-            
-            # Garante diretório
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Salva arquivo
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            # Verifica
-            if not output_path.exists():
-                raise Exception(f"Arquivo não criado: {output_path}")
-            
-            file_size_kb = output_path.stat().st_size / 1024
-            
-            self.log(f"✅ ARQUIVO SALVO COM SUCESSO!", "success")
-            self.log(f"   📊 Tamanho: {file_size_kb:.2f} KB", "info")
-            self.log(f"   📍 Local: {output_path.absolute()}", "info")
-            
-            # Markdown opcional
-            if self.export_markdown.get():
-                self.log("\n📝 Exportando Markdown...", "info")
-                try:
-                    md_path = output_path.with_suffix('.md')
-                    
-                    if hasattr(self, 'pages_data'):
-                        extractor = AdvancedPDFExtractor(method='auto', log_callback=self.log)
-                        extractor.export_markdown(self.pages_data, md_path)
-                        self.log(f"   ✅ Markdown: {md_path.name}", "success")
-                except Exception as md_error:
-                    self.log(f"   ⚠ Erro no Markdown: {md_error}", "warning")
+            if file_size < 100:
+                raise Exception(f"HTML inválido: {file_size} bytes")
+            
+            file_size_kb = file_size / 1024
+            
+            log(f"✅ ARQUIVO SALVO COM SUCESSO!", "success")
+            log(f"   📊 Tamanho: {file_size_kb:.2f} KB", "info")
+            log(f"   📍 Local: {output_path.absolute()}", "info")
             
             # Salvar histórico
             try:
-                self.config.save_to_history({
+                self.config.enqueue_history({
                     'input': str(self.pdf_file),
                     'output': str(output_path),
                     'timestamp': datetime.now().isoformat(),
-                    'method': self.extraction_method.get(),
+                    'method': opts['method'],
                     'theme': theme_name
                 })
             except:
                 pass
             
+            # Markdown opcional: só agora espera o término (correu junto com HTML e histórico)
+            self._finish_markdown_export(markdown_job)
+            
             # Status final
-            final_status = (
-                f"✅ HTML GERADO!\n\n"
-                f"📄 {output_path.name}\n"
-                f"💾 {file_size_kb:.2f} KB\n\n"
-                f"📂 {output_path.parent}\n\n"
-                f"🎨 Tema: {theme_name}"
+            final_status = _HTML_STATUS_MSG.format(
+                name=output_path.name, kb=file_size_kb,
+                parent=output_path.parent, theme=theme_name
             )
-            self.root.after(0, lambda: self.update_status(final_status))
+            self._post_ui(self.update_status, final_status)
             
             # Diálogo de sucesso
-            self.root.after(0, lambda: self._show_html_success(output_path))
+            self._post_ui(self._show_html_success, output_path)
             
         except Exception as e:
-            error_msg = str(e)
-            self.log(f"\n❌ ERRO: {error_msg}", "error")
+            error_msg = _describe_error(e)
+            log(f"\n❌ ERRO: {error_msg}", "error")
+            log(_format_traceback(), "error")
             
-            import traceback
-            self.log(traceback.format_exc(), "error")
-            
-            self.root.after(0, lambda: messagebox.showerror(
+            self._post_ui(
+                messagebox.showerror,
                 "❌ Erro ao Gerar HTML",
                 f"Falha:\n\n{error_msg}\n\nVerifique o log."
-            ))
+            )
         
         finally:
             self.is_processing = False
-            self.root.after(0, self.progress.stop)
-            self.root.after(0, lambda: self.generate_html_btn.config(state='normal'))
-            self.root.after(0, lambda: self.analyze_btn.config(state='normal'))
-            self.root.after(0, lambda: self.convert_btn.config(state='normal'))
+            self._post_ui(self._finish_processing)
     
     def _show_html_success(self, output_path):
         """Mostra diálogo de sucesso do HTML"""
-        result = messagebox.askquestion(
+        if messagebox.askyesno(
             "✅ HTML Gerado!",
-            f"HTML criado com sucesso!\n\n"
-            f"📄 {output_path.name}\n"
-            f"📂 {output_path.parent}\n\n"
-            f"Abrir no navegador?",
+            _HTML_SUCCESS_MSG.format(name=output_path.name, parent=output_path.parent),
             icon='info'
-        )
-        
-        if result == 'yes':
-            webbrowser.open(str(output_path))
+        ):
+            import webbrowser
+            webbrowser.open(output_path.resolve().as_uri(), new=2)
     
     def start_conversion(self):
         """Inicia conversão"""
@@ -626,17 +998,18 @@ class ModernPDFConverterApp:
             messagebox.showerror("❌ Erro", "Selecione um arquivo PDF primeiro!")
             return
         
-        if not self.pdf_file.exists():
-            messagebox.showerror("❌ Erro", f"Arquivo não encontrado:\n{self.pdf_file}")
+        if not self._refresh_pdf_stat():
             return
         
+        opts = self._snapshot_options()
+        
         # Confirmação
         response = messagebox.askyesno(
             "🚀 Iniciar Conversão",
             f"Converter o arquivo:\n\n"
             f"📄 {self.pdf_file.name}\n"
-            f"🎨 Tema: {self.design_theme.get()}\n"
-            f"🔧 Método: {self.extraction_method.get()}\n\n"
+            f"🎨 Tema: {opts['theme']}\n"
+            f"🔧 Método: {opts['method']}\n\n"
             f"Deseja continuar?",
             icon='question'
         )
@@ -655,42 +1028,41 @@ class ModernPDFConverterApp:
         self.log_text.delete('1.0', tk.END)
         self.log_text.config(state='disabled')
         
-        thread = threading.Thread(target=self.convert_pdf, daemon=True)
+        thread = threading.Thread(target=self.convert_pdf, args=(opts,), daemon=True)
         thread.start()
     
-    def convert_pdf(self):
-        """Realiza conversão do PDF"""
+    def convert_pdf(self, opts):
+        """Realiza conversão do PDF (opts: cópia das opções feita por _snapshot_options)"""
+        # Chamado dezenas de vezes: resolvido uma vez só
+        log = self.log
+        
         try:
-            self.log("=" * 70, "accent")
-            self.log("🚀 INICIANDO CONVERSÃO AVANÇADA COM IA", "accent")
-            self.log("=" * 70, "accent")
+            log(_BANNER, "accent")
+            log("🚀 INICIANDO CONVERSÃO AVANÇADA COM IA", "accent")
+            log(_BANNER, "accent")
             
-            # Determina método de extração
-            method = self.extraction_method.get()
-            if method == 'advanced':
-                method = 'auto'
-            elif method == 'fast':
-                method = 'pymupdf'
+            # Método de extração
+            method = opts['extract_method']
             
             # Extrator avançado
-            self.log(f"\n🔧 Método selecionado: {method}", "info")
-            self.log(f"📂 Arquivo: {self.pdf_file}", "info")
-            self.log(f"📊 Tema: {self.design_theme.get()}", "info")
+            log(f"\n🔧 Método selecionado: {method}", "info")
+            log(f"📂 Arquivo: {self.pdf_file}", "info")
+            log(f"📊 Tema: {opts['theme']}", "info")
             
+            from pdf_extractor import AdvancedPDFExtractor
             extractor = AdvancedPDFExtractor(
                 method=method,
-                enable_ocr=self.enable_ocr.get(),
-                log_callback=self.log,
-                progress_callback=lambda p: self.root.after(0, 
-                    lambda prog=p: self.update_status(f"Processando: {int(prog*100)}%"))
+                enable_ocr=opts['ocr'],
+                log_callback=log,
+                progress_callback=functools.partial(self._report_progress, "Processando")
             )
             
             # Extração
-            self.log("\n📄 Extraindo e analisando estrutura...", "info")
-            pages_data = extractor.extract(self.pdf_file)
+            log("\n📄 Extraindo e analisando estrutura...", "info")
+            pages_data = self._get_pages_data(extractor, opts)
             
-            self.log(f"🔍 DEBUG: pages_data tipo: {type(pages_data)}", "warning")
-            self.log(f"🔍 DEBUG: pages_data length: {len(pages_data) if pages_data else 0}", "warning")
+            log(f"🔍 DEBUG: pages_data tipo: {type(pages_data)}", "warning")
+            log(f"🔍 DEBUG: pages_data length: {len(pages_data) if pages_data else 0}", "warning")
             
             if not pages_data:
                 raise Exception("Nenhum dado extraído do PDF")
@@ -698,65 +1070,53 @@ class ModernPDFConverterApp:
             if len(pages_data) == 0:
                 raise Exception("Lista de páginas vazia")
             
-            self.log(f"✅ Extração concluída: {len(pages_data)} páginas", "success")
+            log(f"✅ Extração concluída: {len(pages_data)} páginas", "success")
             
             # Análise
-            self.log("\n🔬 Analisando estrutura do documento...", "info")
-            analysis = extractor.analyze_document_structure(pages_data)
+            log("\n🔬 Analisando estrutura do documento...", "info")
+            analysis = self._get_analysis(extractor, pages_data)
             
-            self.log(f"\n✅ {len(pages_data)} páginas processadas", "success")
-            self.log(f"   • {analysis['total_zones']} zonas detectadas", "info")
-            self.log(f"   • {analysis['total_tables']} tabelas encontradas", "info")
-            self.log(f"   • {analysis['total_images']} imagens detectadas", "info")
-            self.log(f"   • Tipo: {analysis['document_type']}", "info")
+            log(f"\n✅ {len(pages_data)} páginas processadas", "success")
+            log(f"   • {analysis['total_zones']} zonas detectadas", "info")
+            log(f"   • {analysis['total_tables']} tabelas encontradas", "info")
+            log(f"   • {analysis['total_images']} imagens detectadas", "info")
+            log(f"   • Tipo: {analysis['document_type']}", "info")
             
             # Gerador HTML
-            self.log("\n🎨 Criando gerador HTML...", "info")
-            self.log(f"   • Tema: {self.design_theme.get()}", "info")
-            self.log(f"   • TOC: {self.include_toc.get()}", "info")
-            self.log(f"   • Responsivo: {self.responsive_design.get()}", "info")
-            self.log(f"   • Animações: {self.animations.get()}", "info")
+            log("\n🎨 Criando gerador HTML...", "info")
+            log(f"   • Tema: {opts['theme']}", "info")
+            log(f"   • TOC: {opts['toc']}", "info")
+            log(f"   • Responsivo: {opts['responsive']}", "info")
+            log(f"   • Animações: {opts['animations']}", "info")
             
+            from html_generator import HTMLGenerator
             generator = HTMLGenerator(
-                theme=self.design_theme.get(),
-                include_toc=self.include_toc.get(),
-                responsive=self.responsive_design.get(),
-                animations=self.animations.get()
+                theme=opts['theme'],
+                include_toc=opts['toc'],
+                responsive=opts['responsive'],
+                animations=opts['animations']
             )
             
-            self.log("✅ Gerador criado com sucesso", "success")
-            self.log("\n🔄 Gerando conteúdo HTML...", "info")
-            
-            html_content = generator.generate(pages_data)
-            
-            self.log(f"🔍 DEBUG: HTML gerado - tamanho: {len(html_content)} caracteres", "warning")
-            
-            if not html_content:
-                raise Exception("HTML gerado está vazio")
-            
-            if len(html_content) < 100:
-                raise Exception(f"HTML muito pequeno: {len(html_content)} caracteres")
-            
-            self.log("✅ HTML gerado com sucesso!", "success")
+            log("✅ Gerador criado com sucesso", "success")
+            log("\n🔄 Gerando conteúdo HTML...", "info")
             
             # Salvar arquivo HTML
-            theme_name = self.design_theme.get()
-            output_path = self.pdf_file.parent / f"{self.pdf_file.stem}_{theme_name}.html"
+            theme_name = opts['theme']
+            output_path = self._output_path(theme_name)
             
-            self.log(f"\n💾 Salvando arquivo HTML...", "accent")
-            self.log(f"   • Diretório: {output_path.parent}", "info")
-            self.log(f"   • Nome completo: {output_path.name}", "info")
-            self.log(f"   • Caminho absoluto: {output_path.absolute()}", "info")
+            log(f"\n💾 Salvando arquivo HTML...", "accent")
+            log(f"   • Diretório: {output_path.parent}", "info")
+            log(f"   • Nome completo: {output_path.name}", "info")
+            log(f"   • Caminho absoluto: {output_path.absolute()}", "info")
             
             try:
-                # Garante que o diretório existe
-                output_path.parent.mkdir(parents=True, exist_ok=True)
+                # Markdown opcional, escrito enquanto o HTML é gerado
+                markdown_job = self._start_markdown_export(extractor, pages_data, output_path, opts)
                 
-                self.log("   🔄 Escrevendo arquivo...", "info")
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(html_content)
+                log("   🔄 Escrevendo arquivo...", "info")
+                file_size = self._save_html(generator, pages_data, output_path)
                 
-                self.log(f"   ✅ Arquivo escrito!", "success")
+                log(f"   ✅ Arquivo escrito!", "success")
                 
             except PermissionError as pe:
                 raise Exception(f"Sem permissão para escrever em: {output_path}\n{pe}")
@@ -765,31 +1125,26 @@ class ModernPDFConverterApp:
             except Exception as save_error:
                 raise Exception(f"Erro ao salvar arquivo: {save_error}")
             
-            # Verifica se arquivo foi criado
-            self.log("   🔍 Verificando arquivo criado...", "info")
-            if not output_path.exists():
-                raise Exception(f"Arquivo não foi criado: {output_path}")
-            
-            file_size_kb = output_path.stat().st_size / 1024
-            self.log(f"   ✅ Arquivo confirmado!", "success")
-            self.log(f"   • Tamanho: {file_size_kb:.2f} KB", "info")
-            
-            # Markdown opcional
-            if self.export_markdown.get():
-                self.log("\n📝 Exportando Markdown...", "info")
-                try:
-                    md_path = output_path.with_suffix('.md')
-                    extractor.export_markdown(pages_data, md_path)
-                    self.log(f"   ✅ Markdown salvo: {md_path.name}", "success")
-                except Exception as md_error:
-                    self.log(f"   ⚠ Erro no Markdown: {md_error}", "warning")
+            log(f"🔍 DEBUG: HTML gerado - tamanho: {file_size} bytes", "warning")
+            
+            if file_size == 0:
+                raise Exception("HTML gerado está vazio")
+            
+            if file_size < 100:
+                raise Exception(f"HTML muito pequeno: {file_size} bytes")
+            
+            log("✅ HTML gerado com sucesso!", "success")
+            
+            file_size_kb = file_size / 1024
+            log(f"   ✅ Arquivo confirmado!", "success")
+            log(f"   • Tamanho: {file_size_kb:.2f} KB", "info")
             
             self.output_file = output_path
             
             # Salvar no histórico
-            self.log("\n📊 Salvando no histórico...", "info")
+            log("\n📊 Salvando no histórico...", "info")
             try:
-                self.config.save_to_history({
+                self.config.enqueue_history({
                     'input': str(self.pdf_file),
                     'output': str(output_path),
                     'timestamp': datetime.now().isoformat(),
@@ -803,78 +1158,62 @@ class ModernPDFConverterApp:
                         'document_type': analysis['document_type']
                     }
                 })
-                self.log("   ✅ Histórico atualizado", "success")
+                log("   ✅ Histórico atualizado", "success")
             except Exception as hist_error:
-                self.log(f"   ⚠ Erro no histórico: {hist_error}", "warning")
+                log(f"   ⚠ Erro no histórico: {hist_error}", "warning")
+            
+            # Markdown opcional: só agora espera o término (correu junto com HTML e histórico)
+            self._finish_markdown_export(markdown_job)
             
             # Sucesso!
-            self.log("\n" + "=" * 70, "success")
-            self.log("🎉 CONVERSÃO CONCLUÍDA COM SUCESSO! 🎉", "success")
-            self.log("=" * 70, "success")
-            self.log(f"\n📄 Arquivo criado: {output_path.name}", "success")
-            self.log(f"📂 Localização: {output_path.parent}", "info")
+            log("\n" + _BANNER, "success")
+            log("🎉 CONVERSÃO CONCLUÍDA COM SUCESSO! 🎉", "success")
+            log(_BANNER, "success")
+            log(f"\n📄 Arquivo criado: {output_path.name}", "success")
+            log(f"📂 Localização: {output_path.parent}", "info")
             
             # Atualiza status final
-            final_status = (
-                f"✅ CONVERSÃO CONCLUÍDA!\n\n"
-                f"📄 {output_path.name}\n"
-                f"💾 {file_size_kb:.2f} KB\n\n"
-                f"📊 Estatísticas:\n"
-                f"  • {len(pages_data)} páginas\n"
-                f"  • {analysis['total_zones']} zonas\n"
-                f"  • {analysis['total_tables']} tabelas\n"
-                f"  • {analysis['total_images']} imagens\n\n"
-                f"🎨 Tema: {theme_name}"
+            final_status = _CONVERSION_STATUS_MSG.format(
+                name=output_path.name, kb=file_size_kb,
+                pages=len(pages_data), zones=analysis['total_zones'],
+                tables=analysis['total_tables'], images=analysis['total_images'],
+                theme=theme_name
             )
-            self.root.after(0, lambda: self.update_status(final_status))
+            self._post_ui(self.update_status, final_status)
             
             # Mostra diálogo
-            self.root.after(0, lambda: self.show_completion_dialog(output_path))
+            self._post_ui(self.show_completion_dialog, output_path)
             
         except Exception as e:
-            error_msg = str(e)
-            self.log(f"\n{'=' * 70}", "error")
-            self.log(f"❌ ERRO NA CONVERSÃO", "error")
-            self.log(f"{'=' * 70}", "error")
-            self.log(f"\n{error_msg}\n", "error")
-            
-            # Log detalhado do erro
-            import traceback
-            trace = traceback.format_exc()
-            self.log("Detalhes técnicos:", "error")
-            self.log(trace, "error")
-            
-            self.root.after(0, lambda: messagebox.showerror(
-                "❌ Erro na Conversão", 
+            error_msg = _describe_error(e)
+            log("\n" + _BANNER, "error")
+            log(f"❌ ERRO NA CONVERSÃO", "error")
+            log(_BANNER, "error")
+            log(f"\n{error_msg}\n", "error")
+            
+            # Log detalhado do erro (uma mensagem, traceback limitado)
+            log(f"Detalhes técnicos:\n{_format_traceback()}", "error")
+            
+            self._post_ui(
+                messagebox.showerror,
+                "❌ Erro na Conversão",
                 f"Falha ao converter o PDF:\n\n{error_msg}\n\n"
                 f"Verifique o log para mais detalhes."
-            ))
+            )
         
         finally:
             self.is_processing = False
-            self.root.after(0, self.progress.stop)
-            self.root.after(0, lambda: self.convert_btn.config(state='normal'))
-            self.root.after(0, lambda: self.analyze_btn.config(state='normal'))
-            self.root.after(0, lambda: self.generate_html_btn.config(state='normal'))
+            self._post_ui(self._finish_processing)
     
     def show_completion_dialog(self, output_path):
         """Diálogo de conclusão"""
-        result = messagebox.askquestion(
+        if messagebox.askyesno(
             "✅ Sucesso!",
-            f"Conversão concluída!\n\n"
-            f"📄 {output_path.name}\n"
-            f"📁 {output_path.parent}\n\n"
-            f"Recursos:\n"
-            f"✨ Design neumórfico dark\n"
-            f"🎯 Análise com IA\n"
-            f"📱 Responsivo\n"
-            f"🖨️ Pronto para impressão\n\n"
-            f"Abrir agora?",
+            _COMPLETION_MSG.format(name=output_path.name, parent=output_path.parent),
             icon='info'
-        )
-        
-        if result == 'yes':
-            webbrowser.open(str(output_path))
+        ):
+            import webbrowser
+            webbrowser.open(output_path.resolve().as_uri(), new=2)
     
     def save_settings(self):
         """Salva configurações"""
@@ -885,7 +1224,8 @@ class ModernPDFConverterApp:
             'responsive_design': self.responsive_design.get(),
             'animations': self.animations.get(),
             'enable_ocr': self.enable_ocr.get(),
-            'export_markdown': self.export_markdown.get()
+            'export_markdown': self.export_markdown.get(),
+            'parallel_extraction': self.parallel_extraction.get()
         }
         
         self.config.save_settings(settings)
@@ -904,29 +1244,31 @@ class ModernPDFConverterApp:
             self.animations.set(settings.get('animations', True))
             self.enable_ocr.set(settings.get('enable_ocr', False))
             self.export_markdown.set(settings.get('export_markdown', False))
+            self.parallel_extraction.set(settings.get('parallel_extraction', True))
             
             self.log("📂 Configurações carregadas", "info")
     
     def open_last_conversion(self):
         """Abre última conversão"""
-        history = self.config.get_history()
+        last_output = self.config.get_last_output()
         
-        if not history:
+        if not last_output:
             messagebox.showinfo("Info", "Nenhuma conversão anterior")
             return
         
-        last = history[-1]
-        output_path = Path(last['output'])
+        output_path = Path(last_output)
         
         if output_path.exists():
-            webbrowser.open(str(output_path))
+            import webbrowser
+            webbrowser.open(output_path.resolve().as_uri(), new=2)
             self.log(f"📂 Abrindo: {output_path.name}", "success")
         else:
             messagebox.showerror("Erro", "Arquivo não encontrado")
     
     def show_history(self):
         """Mostra histórico"""
-        history = self.config.get_history()
+        # Da mais recente para a mais antiga
+        history = self.config.get_recent(HISTORY_WINDOW_SIZE)
         
         if not history:
             messagebox.showinfo("Histórico", "Nenhuma conversão realizada ainda")
@@ -943,31 +1285,44 @@ class ModernPDFConverterApp:
         
         ttk.Label(frame, text="📊 Histórico", style='Title.TLabel').pack(pady=10)
         
-        # Lista
-        text = tk.Text(frame, font=('Consolas', 9), bg=self.colors['surface'], 
-                      fg=self.colors['fg'], wrap=tk.WORD)
-        text.pack(fill='both', expand=True)
+        # Lista: Treeview é virtualizado pelo Tk (históricos longos não pesam)
+        list_frame = ttk.Frame(frame)
+        list_frame.pack(fill='both', expand=True)
         
-        for i, entry in enumerate(reversed(history[-10:]), 1):
-            timestamp = datetime.fromisoformat(entry['timestamp']).strftime("%d/%m/%Y %H:%M")
-            input_file = Path(entry['input']).name
-            theme = entry.get('theme', 'unknown')
-            
-            text.insert(tk.END, f"\n{'='*60}\n")
-            text.insert(tk.END, f"#{i} - {timestamp}\n")
-            text.insert(tk.END, f"📄 {input_file}\n")
-            text.insert(tk.END, f"🎨 {theme}\n")
-            
-            if 'analysis' in entry:
-                analysis = entry['analysis']
-                text.insert(tk.END, f"📊 {analysis.get('total_pages', 0)} páginas, ")
-                text.insert(tk.END, f"{analysis.get('total_tables', 0)} tabelas\n")
+        scrollbar = ttk.Scrollbar(list_frame)
+        scrollbar.pack(side='right', fill='y')
         
-        text.config(state='disabled')
+        tree = ttk.Treeview(
+            list_frame,
+            columns=[column for column, _, _ in self._HISTORY_COLUMNS],
+            show='headings',
+            style='History.Treeview',
+            yscrollcommand=scrollbar.set
+        )
+        tree.pack(side='left', fill='both', expand=True)
+        scrollbar.config(command=tree.yview)
+        
+        for column, heading, width in self._HISTORY_COLUMNS:
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, anchor='w')
+        
+        insert = tree.insert
+        for entry in history:
+            timestamp, input_file = _history_labels(entry['timestamp'], entry['input'])
+            analysis = entry.get('analysis') or {}
+            insert('', tk.END, values=(
+                timestamp,
+                input_file,
+                entry.get('theme', 'unknown'),
+                analysis.get('total_pages', ''),
+                analysis.get('total_tables', ''),
+            ))
 
 
 def main():
     """Função principal"""
+    # Extração paralela usa processos: necessário em executáveis congelados (Windows)
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = ModernPDFConverterApp(root)
     root.mainloop()
@@ -4,11 +4,15 @@ Detecta layout visual, posições, estrutura e usa ML para classificação
 """
 
 import fitz  # PyMuPDF
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional, Set
-from collections import defaultdict, Counter
+from typing import Iterable, Iterator, List, Dict, Tuple, Optional, Set
+from collections import defaultdict, Counter, OrderedDict
 from dataclasses import dataclass
+from operator import itemgetter
+import os
 import re
+import threading
 import numpy as np
 
 try:
@@ -29,10 +33,136 @@ try:
 except ImportError:
     PIL_AVAILABLE = False
 
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# Abaixo disso, subir processos custa mais que o ganho do paralelismo por página
+PAGE_PARALLEL_MIN_PAGES = 10
+
+# Intervalos por processo: mais de um equilibra páginas lentas (tabelas, imagens)
+# entre os workers; poucos o bastante para o pdfplumber abrir uma vez por intervalo
+PAGE_PARALLEL_CHUNKS_PER_WORKER = 4
+
+# extract_pdf_smart: estratégia por tamanho do PDF, na ordem
+# (máximo de páginas, método, limite de processos); None = sem limite
+SMART_RULES = (
+    (PAGE_PARALLEL_MIN_PAGES - 1, 'batch', 1),   # poucos: subir processos não compensa
+    (50, 'processes', 4),                        # médios: poucos processos bastam
+    (None, 'processes', None),                   # grandes: todos os núcleos
+)
+
+# Buscas usadas por IntelligentContentAnalyzer._extract_features, compiladas uma vez
+_has_digit = re.compile(r'\d').search
+_has_ascii_upper = re.compile(r'[A-Z]').search
+_starts_with_number = re.compile(r'\d+\.?\s').match
+
+
+class _UppercaseOnly(dict):
+    """Tabela de str.translate que mantém só as maiúsculas (str.isupper)
+    
+    Preenchida sob demanda a cada caractere novo, então vale para todo o
+    Unicode sem montar a tabela inteira; len(text.translate(...)) conta as
+    maiúsculas sem laço em Python.
+    """
+    
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        kept = codepoint if chr(codepoint).isupper() else None
+        self[codepoint] = kept
+        return kept
+
+
+_UPPERCASE_ONLY = _UppercaseOnly()
+
+# A partir de quantos itens (posições, blocos) as versões NumPy superam os laços em Python
+NUMPY_MIN_ITEMS = 64
+
+# Menos traços (linhas/retângulos) que isso, sem palavras de tabela: página sem tabela
+TABLE_MIN_RULES = 4
+
+# Faixas da altura da página tratadas como header (acima) e footer (abaixo)
+HEADER_ZONE_FRACTION = 0.1  # 10% superior
+FOOTER_ZONE_FRACTION = 0.9  # 10% inferior
+
+# Página com imagem e menos caracteres de texto que isso é tratada como escaneada
+SCANNED_TEXT_MAX_CHARS = 32
+
+# Extensão que extract_image devolveria por filtro do stream: esses formatos saem
+# como estão no arquivo, os demais seriam convertidos para PNG
+_IMAGE_FILTER_EXT = {
+    'DCTDecode': 'jpeg',
+    'JPXDecode': 'jpx',
+    'JBIG2Decode': 'jb2',
+}
+
+# Componentes de cor por nome de espaço (lista de imagens), quando o pixmap não
+# informa um espaço de cor: o mesmo inteiro que extract_image devolveria
+_COLORSPACE_COMPONENTS = {
+    'DeviceGray': 1, 'CalGray': 1,
+    'DeviceRGB': 3, 'CalRGB': 3, 'Lab': 3,
+    'DeviceCMYK': 4,
+}
+
+# Markdown por tipo de zona: (prefixo, sufixo) em volta do texto; listas à parte
+_MARKDOWN_ZONE_WRAP = {
+    'title': ("\n# ", "\n"),
+    'subtitle': ("\n## ", "\n"),
+    'header': ("\n### ", "\n"),
+    'card': ("\n> **", "**\n"),
+}
+_MARKDOWN_PARAGRAPH_WRAP = ("\n", "\n")
+
+# Uma tabela válida (cabeçalho + 1 linha) precisa de ao menos 3 traços horizontais
+TABLE_MIN_HORIZONTAL_EDGES = 3
+
+# Combinações de features já pontuadas guardadas pelo classificador de zonas (LRU)
+ZONE_SCORE_CACHE_SIZE = 4096
+
+
+def _pairwise_overlap_numpy(x0a: np.ndarray, x1a: np.ndarray,
+                            x0b: np.ndarray, x1b: np.ndarray) -> np.ndarray:
+    """Sobreposição horizontal de cada par (a[i], b[i]) relativa à largura menor"""
+    overlap = np.minimum(x1a, x1b) - np.maximum(x0a, x0b)
+    min_width = np.minimum(x1a - x0a, x1b - x0b)
+    valid = (overlap > 0) & (min_width > 0)
+    result = np.zeros_like(overlap)
+    np.divide(overlap, min_width, out=result, where=valid)
+    return result
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _pairwise_overlap(x0a, x1a, x0b, x1b):
+        """Versão compilada de _pairwise_overlap_numpy (um laço, sem arrays temporários)"""
+        n = x0a.shape[0]
+        result = np.zeros(n)
+        for i in range(n):
+            overlap = min(x1a[i], x1b[i]) - max(x0a[i], x0b[i])
+            min_width = min(x1a[i] - x0a[i], x1b[i] - x0b[i])
+            if overlap > 0 and min_width > 0:
+                result[i] = overlap / min_width
+        return result
+else:
+    _pairwise_overlap = _pairwise_overlap_numpy
+
 
 @dataclass
 class TextBlock:
     """Representa um bloco de texto com metadados"""
+    # Sem __dict__ por instância: uma página gera milhares de blocos
+    # (declarado à mão porque dataclass(slots=True) exige Python 3.10)
+    __slots__ = ('x0', 'y0', 'x1', 'y1', 'text', 'font_size', 'font_name',
+                 'font_weight', 'color', 'is_bold', 'is_italic')
+    
     x0: float
     y0: float
     x1: float
@@ -66,6 +196,20 @@ class TextBlock:
         return self.width * self.height
 
 
+class TextBlockList(list):
+    """Lista de TextBlock com as bboxes também num array (N, 4) de x0, y0, x1, y1
+    
+    Os cálculos vetorizados usam `bboxes` direto, sem reler atributo por atributo.
+    """
+    __slots__ = ('bboxes',)
+    
+    def __init__(self, blocks: Iterable[TextBlock] = (), bboxes: Optional[np.ndarray] = None):
+        super().__init__(blocks)
+        if bboxes is None:
+            bboxes = np.array([(b.x0, b.y0, b.x1, b.y1) for b in self], dtype=np.float64)
+        self.bboxes = bboxes.reshape(-1, 4)
+
+
 class SmartLayoutDetector:
     """Detector de layout inteligente com algoritmos avançados"""
     
@@ -75,12 +219,28 @@ class SmartLayoutDetector:
         self.width = self.page_rect.width
         self.height = self.page_rect.height
         self.margin_threshold = 50  # pixels
+        
+        # Dicionário de cada bloco (por id), criado uma vez e compartilhado entre a
+        # zona, a lista de blocos da página e header/footer
+        self._block_dicts: Dict[int, Dict] = {}
     
     def detect_margins(self, text_blocks: List[TextBlock]) -> Dict[str, float]:
         """Detecta margens da página"""
         if not text_blocks:
             return {'left': 0, 'right': self.width, 'top': 0, 'bottom': self.height}
         
+        bboxes = getattr(text_blocks, 'bboxes', None)
+        if bboxes is not None:
+            # Reduções direto no array (N, 4) de x0, y0, x1, y1 da TextBlockList
+            x_positions = bboxes[:, 0::2]
+            y_positions = bboxes[:, 1::2]
+            return {
+                'left': float(x_positions.min()),
+                'right': float(x_positions.max()),
+                'top': float(y_positions.min()),
+                'bottom': float(y_positions.max())
+            }
+        
         x_positions = [b.x0 for b in text_blocks] + [b.x1 for b in text_blocks]
         y_positions = [b.y0 for b in text_blocks] + [b.y1 for b in text_blocks]
         
@@ -115,6 +275,15 @@ class SmartLayoutDetector:
         if not positions:
             return []
         
+        if len(positions) >= NUMPY_MIN_ITEMS:
+            # Quebra onde a distância ao vizinho passa da tolerância; cumsum numera
+            # os clusters e bincount ponderado dá a média de cada um
+            arr = np.sort(np.asarray(positions, dtype=np.float64))
+            ids = np.empty(len(arr), dtype=np.intp)
+            ids[0] = 0
+            np.cumsum(np.diff(arr) > tolerance, out=ids[1:])
+            return (np.bincount(ids, weights=arr) / np.bincount(ids)).tolist()
+        
         sorted_pos = sorted(positions)
         clusters = []
         current_cluster = [sorted_pos[0]]
@@ -133,53 +302,81 @@ class SmartLayoutDetector:
     
     def detect_visual_boxes(self) -> List[Dict]:
         """Detecta caixas/cards visuais por bordas, sombreamento e retângulos"""
-        boxes = []
-        drawings = self.page.get_drawings()
-        
-        for drawing in drawings:
+        # get_cdrawings: os mesmos caminhos de get_drawings, sem converter cada
+        # ponto/retângulo em objetos Point/Rect
+        rects = []
+        owners = []
+        for drawing in self.page.get_cdrawings():
             for item in drawing['items']:
-                if item[0] == 'r':  # retângulo
-                    if len(item) >= 3:
-                        rect = item[1]
-                        
-                        # Calcula área e proporções
-                        area = rect.width * rect.height
-                        page_area = self.width * self.height
-                        area_ratio = area / page_area
-                        aspect_ratio = rect.width / rect.height if rect.height > 0 else 0
-                        
-                        # Filtra boxes relevantes
-                        if 0.005 < area_ratio < 0.95 and rect.width > 50 and rect.height > 30:
-                            boxes.append({
-                                'type': 'visual_box',
-                                'x0': rect.x0,
-                                'y0': rect.y0,
-                                'x1': rect.x1,
-                                'y1': rect.y1,
-                                'width': rect.width,
-                                'height': rect.height,
-                                'area': area,
-                                'area_ratio': area_ratio,
-                                'aspect_ratio': aspect_ratio,
-                                'color': drawing.get('color', None),
-                                'fill': drawing.get('fill', None),
-                                'stroke_width': drawing.get('width', 1)
-                            })
+                if item[0] == 're':  # retângulo
+                    rects.append(item[1])
+                    owners.append(drawing)
         
-        return sorted(boxes, key=lambda x: x['area'], reverse=True)
+        if not rects:
+            return []
+        
+        # Coordenadas normalizadas (como Rect.normalize em get_drawings), calculadas
+        # de uma vez para todos os retângulos da página
+        coords = np.array(rects, dtype=np.float64)
+        x0 = np.minimum(coords[:, 0], coords[:, 2])
+        y0 = np.minimum(coords[:, 1], coords[:, 3])
+        x1 = np.maximum(coords[:, 0], coords[:, 2])
+        y1 = np.maximum(coords[:, 1], coords[:, 3])
+        width = x1 - x0
+        height = y1 - y0
+        area = width * height
+        area_ratio = area / (self.width * self.height)
+        
+        # Filtra boxes relevantes
+        keep = np.flatnonzero((area_ratio > 0.005) & (area_ratio < 0.95) & (width > 50) & (height > 30))
+        
+        # Maior área primeiro; 'stable' mantém empates na ordem do desenho
+        keep = keep[np.argsort(-area[keep], kind='stable')]
+        
+        boxes = []
+        for i, bx0, by0, bx1, by1, w, h, a, ratio in zip(
+            keep.tolist(), x0[keep].tolist(), y0[keep].tolist(), x1[keep].tolist(),
+            y1[keep].tolist(), width[keep].tolist(), height[keep].tolist(),
+            area[keep].tolist(), area_ratio[keep].tolist()
+        ):
+            drawing = owners[i]
+            boxes.append({
+                'type': 'visual_box',
+                'x0': bx0,
+                'y0': by0,
+                'x1': bx1,
+                'y1': by1,
+                'width': w,
+                'height': h,
+                'area': a,
+                'area_ratio': ratio,
+                'aspect_ratio': w / h,
+                'color': drawing.get('color'),
+                'fill': drawing.get('fill'),
+                # get_drawings preenche com None as chaves ausentes do caminho
+                'stroke_width': drawing.get('width')
+            })
+        
+        return boxes
     
     def detect_reading_order_zones(self, text_blocks: List[TextBlock]) -> List[Dict]:
         """Divide página em zonas respeitando ordem natural de leitura"""
         if not text_blocks:
             return []
         
+        vertical_tolerance = 15
+        horizontal_tolerance = self.width * 0.15
+        
+        if len(text_blocks) >= NUMPY_MIN_ITEMS:
+            return self._reading_order_zones_vectorized(
+                text_blocks, vertical_tolerance, horizontal_tolerance
+            )
+        
         # Ordena blocos por posição (top-to-bottom, left-to-right)
         sorted_blocks = sorted(text_blocks, key=lambda b: (b.y0, b.x0))
         
         zones = []
         current_zone = []
-        vertical_tolerance = 15
-        horizontal_tolerance = self.width * 0.15
         
         for block in sorted_blocks:
             if not current_zone:
@@ -207,6 +404,41 @@ class SmartLayoutDetector:
         
         return zones
     
+    def _reading_order_zones_vectorized(self, text_blocks: List[TextBlock],
+                                        vertical_tolerance: float,
+                                        horizontal_tolerance: float) -> List[Dict]:
+        """detect_reading_order_zones em NumPy: mesmo critério, comparando de uma vez
+        cada bloco com o anterior na ordem de leitura"""
+        coords = getattr(text_blocks, 'bboxes', None)
+        if coords is None:
+            coords = np.array([(b.x0, b.y0, b.x1, b.y1) for b in text_blocks], dtype=np.float64)
+        
+        # lexsort é estável: empates ficam na ordem original, como no sorted()
+        order = np.lexsort((coords[:, 0], coords[:, 1]))
+        x0, y0, x1, y1 = coords[order].T
+        sorted_blocks = [text_blocks[i] for i in order.tolist()]
+        
+        vertical_gap = y0[1:] - y1[:-1]
+        
+        # Sobreposição horizontal relativa à largura menor (0 sem sobreposição)
+        horizontal_overlap = _pairwise_overlap(
+            np.ascontiguousarray(x0[:-1]), np.ascontiguousarray(x1[:-1]),
+            np.ascontiguousarray(x0[1:]), np.ascontiguousarray(x1[1:])
+        )
+        
+        same_zone = (
+            ((vertical_gap < vertical_tolerance) & (horizontal_overlap > 0.5)) |
+            ((vertical_gap < vertical_tolerance * 2) &
+             (np.abs(x0[1:] - x0[:-1]) < horizontal_tolerance))
+        )
+        
+        # Índices onde começa uma nova zona
+        bounds = [0] + (np.flatnonzero(~same_zone) + 1).tolist() + [len(sorted_blocks)]
+        return [
+            self._create_zone_from_blocks(sorted_blocks[start:end])
+            for start, end in zip(bounds, bounds[1:])
+        ]
+    
     def _calculate_horizontal_overlap(self, block1: TextBlock, block2: TextBlock) -> float:
         """Calcula percentual de sobreposição horizontal entre dois blocos"""
         overlap_start = max(block1.x0, block2.x0)
@@ -222,26 +454,41 @@ class SmartLayoutDetector:
     
     def _create_zone_from_blocks(self, blocks: List[TextBlock]) -> Dict:
         """Cria zona a partir de blocos com metadados enriquecidos"""
-        x0 = min(b.x0 for b in blocks)
-        y0 = min(b.y0 for b in blocks)
-        x1 = max(b.x1 for b in blocks)
-        y1 = max(b.y1 for b in blocks)
-        
-        # Extrai texto preservando ordem e formatação
+        # Uma passada acumula bbox, texto, fontes, ênfases e a exportação dos blocos
+        first = blocks[0]
+        x0, y0, x1, y1 = first.x0, first.y0, first.x1, first.y1
+        font_size_total = 0
+        max_font_size = first.font_size
+        has_bold = has_italic = False
         text_parts = []
-        for block in blocks:
-            text_parts.append(block.text.strip())
+        block_dicts = []
+        block_to_dict = self._block_to_dict
         
-        text = '\n'.join(filter(None, text_parts))
-        
-        # Calcula estatísticas de fonte
-        font_sizes = [b.font_size for b in blocks]
-        avg_font_size = sum(font_sizes) / len(font_sizes)
-        max_font_size = max(font_sizes)
+        for block in blocks:
+            if block.x0 < x0:
+                x0 = block.x0
+            if block.y0 < y0:
+                y0 = block.y0
+            if block.x1 > x1:
+                x1 = block.x1
+            if block.y1 > y1:
+                y1 = block.y1
+            
+            # Texto preservando ordem, sem blocos vazios
+            part = block.text.strip()
+            if part:
+                text_parts.append(part)
+            
+            font_size_total += block.font_size
+            if block.font_size > max_font_size:
+                max_font_size = block.font_size
+            
+            has_bold = has_bold or block.is_bold
+            has_italic = has_italic or block.is_italic
+            block_dicts.append(block_to_dict(block))
         
-        # Detecta ênfases
-        has_bold = any(b.is_bold for b in blocks)
-        has_italic = any(b.is_italic for b in blocks)
+        text = '\n'.join(text_parts)
+        avg_font_size = font_size_total / len(blocks)
         
         return {
             'x0': x0,
@@ -251,7 +498,7 @@ class SmartLayoutDetector:
             'width': x1 - x0,
             'height': y1 - y0,
             'text': text,
-            'blocks': [self._block_to_dict(b) for b in blocks],
+            'blocks': block_dicts,
             'avg_font_size': avg_font_size,
             'max_font_size': max_font_size,
             'has_bold': has_bold,
@@ -259,19 +506,26 @@ class SmartLayoutDetector:
             'block_count': len(blocks)
         }
     
+    def export_blocks(self, text_blocks: List[TextBlock]) -> List[Dict]:
+        """Blocos no formato exportável, reaproveitando os dicionários das zonas"""
+        return [self._block_to_dict(b) for b in text_blocks]
+    
     def _block_to_dict(self, block: TextBlock) -> Dict:
         """Converte TextBlock para dicionário"""
-        return {
-            'x0': block.x0,
-            'y0': block.y0,
-            'x1': block.x1,
-            'y1': block.y1,
-            'text': block.text,
-            'font_size': block.font_size,
-            'font_name': block.font_name,
-            'is_bold': block.is_bold,
-            'is_italic': block.is_italic
-        }
+        block_dict = self._block_dicts.get(id(block))
+        if block_dict is None:
+            block_dict = self._block_dicts[id(block)] = {
+                'x0': block.x0,
+                'y0': block.y0,
+                'x1': block.x1,
+                'y1': block.y1,
+                'text': block.text,
+                'font_size': block.font_size,
+                'font_name': block.font_name,
+                'is_bold': block.is_bold,
+                'is_italic': block.is_italic
+            }
+        return block_dict
 
 
 class IntelligentContentAnalyzer:
@@ -290,41 +544,125 @@ class IntelligentContentAnalyzer:
     TABLE_INDICATORS = ['total', 'média', 'soma', '%', 'valor', 'quantidade',
                        'descrição', 'item', 'código', 'nome', 'data']
     
+    # Buscas de _extract_features compiladas uma vez (uma varredura do texto cada)
+    _has_list_marker = re.compile('|'.join(map(re.escape, LIST_MARKERS))).search
+    _has_table_word = re.compile('|'.join(map(re.escape, TABLE_INDICATORS))).search
+    
+    # Marcador no início do item, removido por extract_structured_list
+    _strip_list_marker = re.compile(r'^[•○●■□▪▫►▸⦿⦾\-\*→⇒»›✓✗\d+\.)\]]\s*').sub
+    
+    # "Chave: Valor" a partir do início da linha (após ':' iniciais, como a busca
+    # sem âncora fazia): uma linha sem ':' é descartada numa só tentativa, em vez
+    # de uma por posição
+    _find_key_values = re.compile(r'^:*([^:\n]+):\s*([^\n]+)', re.MULTILINE).finditer
+    
+    # Tipos de zona e o método de score de cada um (a ordem desempata o máximo)
+    _ZONE_SCORERS = (
+        ('title', '_score_title'),
+        ('subtitle', '_score_subtitle'),
+        ('header', '_score_header'),
+        ('paragraph', '_score_paragraph'),
+        ('list', '_score_list'),
+        ('table_like', '_score_table'),
+        ('card', '_score_card'),
+        ('caption', '_score_caption'),
+        ('footnote', '_score_footnote'),
+    )
+    
+    # Features lidas pelos _score_*: zonas com os mesmos valores exatos (cabeçalhos,
+    # rodapés e numeração repetidos a cada página) reaproveitam os scores
+    _SCORE_FEATURES = (
+        'width', 'height', 'area', 'aspect_ratio', 'word_count', 'line_count',
+        'avg_line_length', 'avg_font_size', 'max_font_size', 'has_bold', 'has_italic',
+        'block_count', 'has_numbers', 'uppercase_ratio', 'has_list_markers',
+        'has_table_words', 'is_short', 'starts_with_number', 'is_all_caps', 'has_colon',
+    )
+    # LRU compartilhado entre threads (lotes do batch_converter): só acessado com o lock
+    _score_cache: "OrderedDict[tuple, Dict[str, float]]" = OrderedDict()
+    _score_cache_lock = threading.Lock()
+    
     @classmethod
     def classify_zone_advanced(cls, zone: Dict, page_context: Dict = None) -> Dict:
         """Classificação avançada com múltiplos critérios e score de confiança"""
-        text = zone['text']
-        text_lower = text.lower()
+        return cls.classify_zones([zone])[0]
+    
+    @classmethod
+    def classify_zones(cls, zones: List[Dict]) -> List[Dict]:
+        """Classifica várias zonas de uma vez (mesmo resultado de classify_zone_advanced)
+        
+        As features viram colunas NumPy (uma posição por zona) e cada _score_*
+        calcula o score de todas as zonas numa única expressão vetorizada; só
+        as combinações de features ainda fora do cache são pontuadas.
+        """
+        if not zones:
+            return []
         
         # Features para classificação
-        features = cls._extract_features(zone, text, text_lower)
-        
-        # Sistema de scoring para cada tipo
-        scores = {
-            'title': cls._score_title(features),
-            'subtitle': cls._score_subtitle(features),
-            'header': cls._score_header(features),
-            'paragraph': cls._score_paragraph(features),
-            'list': cls._score_list(features),
-            'table_like': cls._score_table(features),
-            'card': cls._score_card(features),
-            'caption': cls._score_caption(features),
-            'footnote': cls._score_footnote(features)
-        }
-        
-        # Identifica tipo com maior score
-        best_type = max(scores.items(), key=lambda x: x[1])
+        features_list = [
+            cls._extract_features(zone, zone['text'], zone['text'].lower())
+            for zone in zones
+        ]
+        keys = [tuple(f[name] for name in cls._SCORE_FEATURES) for f in features_list]
+        
+        # Scores desta chamada num dict local: o que sai do cache depois não
+        # afeta as zonas já resolvidas aqui
+        cache = cls._score_cache
+        scores_by_key = {}
+        missing = []
+        with cls._score_cache_lock:
+            for key in dict.fromkeys(keys):
+                cached = cache.get(key)
+                if cached is None:
+                    missing.append(key)
+                else:
+                    cache.move_to_end(key)
+                    scores_by_key[key] = cached
         
-        return {
-            'type': best_type[0],
-            'confidence': best_type[1],
-            'scores': scores,
-            'features': features
-        }
+        if missing:
+            columns = {name: np.array(column)
+                       for name, column in zip(cls._SCORE_FEATURES, zip(*missing))}
+            
+            # Sistema de scoring para cada tipo
+            score_columns = [
+                (zone_type, getattr(cls, scorer)(columns).tolist())
+                for zone_type, scorer in cls._ZONE_SCORERS
+            ]
+            
+            for i, key in enumerate(missing):
+                # Limita a [0, 1] como antes: max/min em Python mantêm os valores idênticos
+                scores_by_key[key] = {zone_type: max(0, min(1, values[i]))
+                                      for zone_type, values in score_columns}
+            
+            # Guarda os novos scores e descarta os menos usados recentemente
+            with cls._score_cache_lock:
+                for key in missing:
+                    cache[key] = scores_by_key[key]
+                    cache.move_to_end(key)
+                while len(cache) > ZONE_SCORE_CACHE_SIZE:
+                    cache.popitem(last=False)
+        
+        results = []
+        for key, features in zip(keys, features_list):
+            scores = dict(scores_by_key[key])
+            
+            # Identifica tipo com maior score
+            best_type = max(scores.items(), key=lambda x: x[1])
+            
+            results.append({
+                'type': best_type[0],
+                'confidence': best_type[1],
+                'scores': scores,
+                'features': features
+            })
+        
+        return results
     
     @classmethod
     def _extract_features(cls, zone: Dict, text: str, text_lower: str) -> Dict:
         """Extrai features para classificação"""
+        text_length = len(text)
+        line_count = text.count('\n') + 1
+        
         return {
             # Dimensões
             'width': zone['width'],
@@ -333,10 +671,10 @@ class IntelligentContentAnalyzer:
             'aspect_ratio': zone['width'] / zone['height'] if zone['height'] > 0 else 0,
             
             # Texto
-            'text_length': len(text),
+            'text_length': text_length,
             'word_count': len(text.split()),
-            'line_count': len(text.split('\n')),
-            'avg_line_length': len(text) / max(len(text.split('\n')), 1),
+            'line_count': line_count,
+            'avg_line_length': text_length / line_count,
             
             # Formatação
             'avg_font_size': zone.get('avg_font_size', 12),
@@ -346,155 +684,168 @@ class IntelligentContentAnalyzer:
             'block_count': zone.get('block_count', 1),
             
             # Conteúdo
-            'has_numbers': bool(re.search(r'\d', text)),
-            'has_uppercase': bool(re.search(r'[A-Z]', text)),
-            'uppercase_ratio': sum(1 for c in text if c.isupper()) / max(len(text), 1),
-            'has_list_markers': any(marker in text for marker in cls.LIST_MARKERS),
-            'has_table_words': any(word in text_lower for word in cls.TABLE_INDICATORS),
-            'is_short': len(text) < 100,
-            'is_long': len(text) > 500,
+            'has_numbers': _has_digit(text) is not None,
+            'has_uppercase': _has_ascii_upper(text) is not None,
+            'uppercase_ratio': len(text.translate(_UPPERCASE_ONLY)) / max(text_length, 1),
+            'has_list_markers': cls._has_list_marker(text) is not None,
+            'has_table_words': cls._has_table_word(text_lower) is not None,
+            'is_short': text_length < 100,
+            'is_long': text_length > 500,
             
             # Estrutura
-            'starts_with_number': bool(re.match(r'^\d+\.?\s', text)),
+            'starts_with_number': _starts_with_number(text) is not None,
             'is_all_caps': text.isupper() and len(text) > 3,
             'has_colon': ':' in text,
             'has_dash': '—' in text or '–' in text,
         }
     
+    # Scores sem limite (classify_zones aplica o [0, 1]); `f` mapeia cada feature
+    # para um array com uma posição por zona. Cada regra soma seu peso onde a
+    # condição vale, na mesma ordem das regras, então os floats não mudam
+    
     @classmethod
-    def _score_title(cls, f: Dict) -> float:
+    def _score_title(cls, f: Dict) -> np.ndarray:
         """Score para título principal"""
-        score = 0.0
+        max_font = f['max_font_size']
+        score = np.zeros(len(max_font))
         
         # Tamanho de fonte grande
-        if f['max_font_size'] >= 24: score += 0.4
-        elif f['max_font_size'] >= 20: score += 0.3
-        elif f['max_font_size'] >= 16: score += 0.2
+        score += 0.4 * (max_font >= 24)
+        score += 0.3 * ((max_font >= 20) & (max_font < 24))
+        score += 0.2 * ((max_font >= 16) & (max_font < 20))
         
         # Texto curto
-        if f['word_count'] <= 10: score += 0.2
+        score += 0.2 * (f['word_count'] <= 10)
         
         # Bold ou maiúsculas
-        if f['has_bold']: score += 0.15
-        if f['is_all_caps']: score += 0.15
+        score += 0.15 * f['has_bold']
+        score += 0.15 * f['is_all_caps']
         
         # Proporções
-        if f['height'] > 40: score += 0.1
+        score += 0.1 * (f['height'] > 40)
         
         # Penalidades
-        if f['word_count'] > 20: score -= 0.3
-        if f['line_count'] > 2: score -= 0.2
+        score -= 0.3 * (f['word_count'] > 20)
+        score -= 0.2 * (f['line_count'] > 2)
         
-        return max(0, min(1, score))
+        return score
     
     @classmethod
-    def _score_subtitle(cls, f: Dict) -> float:
+    def _score_subtitle(cls, f: Dict) -> np.ndarray:
         """Score para subtítulo"""
-        score = 0.0
+        max_font = f['max_font_size']
+        word_count = f['word_count']
+        score = np.zeros(len(max_font))
         
-        if 14 <= f['max_font_size'] < 20: score += 0.3
-        if f['has_bold']: score += 0.2
-        if 3 <= f['word_count'] <= 15: score += 0.2
-        if f['starts_with_number']: score += 0.15
-        if f['uppercase_ratio'] > 0.3: score += 0.15
+        score += 0.3 * ((max_font >= 14) & (max_font < 20))
+        score += 0.2 * f['has_bold']
+        score += 0.2 * ((word_count >= 3) & (word_count <= 15))
+        score += 0.15 * f['starts_with_number']
+        score += 0.15 * (f['uppercase_ratio'] > 0.3)
         
-        return max(0, min(1, score))
+        return score
     
     @classmethod
-    def _score_header(cls, f: Dict) -> float:
+    def _score_header(cls, f: Dict) -> np.ndarray:
         """Score para cabeçalho de seção"""
-        score = 0.0
+        max_font = f['max_font_size']
+        score = np.zeros(len(max_font))
         
-        if f['has_bold']: score += 0.3
-        if f['starts_with_number']: score += 0.2
-        if 13 <= f['max_font_size'] <= 18: score += 0.2
-        if f['word_count'] <= 12: score += 0.15
-        if f['has_colon']: score += 0.15
+        score += 0.3 * f['has_bold']
+        score += 0.2 * f['starts_with_number']
+        score += 0.2 * ((max_font >= 13) & (max_font <= 18))
+        score += 0.15 * (f['word_count'] <= 12)
+        score += 0.15 * f['has_colon']
         
-        return max(0, min(1, score))
+        return score
     
     @classmethod
-    def _score_paragraph(cls, f: Dict) -> float:
+    def _score_paragraph(cls, f: Dict) -> np.ndarray:
         """Score para parágrafo normal"""
-        score = 0.3  # Base score
+        avg_font = f['avg_font_size']
+        score = np.full(len(avg_font), 0.3)  # Base score
         
-        if f['word_count'] >= 15: score += 0.2
-        if f['line_count'] >= 2: score += 0.15
-        if 10 <= f['avg_font_size'] <= 13: score += 0.2
-        if not f['has_bold'] and not f['is_all_caps']: score += 0.15
+        score += 0.2 * (f['word_count'] >= 15)
+        score += 0.15 * (f['line_count'] >= 2)
+        score += 0.2 * ((avg_font >= 10) & (avg_font <= 13))
+        score += 0.15 * (~f['has_bold'] & ~f['is_all_caps'])
         
-        return max(0, min(1, score))
+        return score
     
     @classmethod
-    def _score_list(cls, f: Dict) -> float:
+    def _score_list(cls, f: Dict) -> np.ndarray:
         """Score para lista"""
-        score = 0.0
+        avg_line = f['avg_line_length']
+        score = np.zeros(len(avg_line))
         
-        if f['has_list_markers']: score += 0.5
-        if f['line_count'] >= 3: score += 0.2
-        if f['starts_with_number']: score += 0.15
-        if 50 < f['avg_line_length'] < 200: score += 0.15
+        score += 0.5 * f['has_list_markers']
+        score += 0.2 * (f['line_count'] >= 3)
+        score += 0.15 * f['starts_with_number']
+        score += 0.15 * ((avg_line > 50) & (avg_line < 200))
         
-        return max(0, min(1, score))
+        return score
     
     @classmethod
-    def _score_table(cls, f: Dict) -> float:
+    def _score_table(cls, f: Dict) -> np.ndarray:
         """Score para estrutura tabular"""
-        score = 0.0
+        aspect = f['aspect_ratio']
+        score = np.zeros(len(aspect))
         
-        if f['has_table_words']: score += 0.25
-        if f['block_count'] >= 6: score += 0.25
-        if f['has_numbers']: score += 0.15
-        if 0.5 < f['aspect_ratio'] < 2: score += 0.15
-        if f['line_count'] >= 4: score += 0.1
+        score += 0.25 * f['has_table_words']
+        score += 0.25 * (f['block_count'] >= 6)
+        score += 0.15 * f['has_numbers']
+        score += 0.15 * ((aspect > 0.5) & (aspect < 2))
+        score += 0.1 * (f['line_count'] >= 4)
         
         # Alto número de blocos sugere estrutura
-        if f['block_count'] >= 10: score += 0.1
+        score += 0.1 * (f['block_count'] >= 10)
         
-        return max(0, min(1, score))
+        return score
     
     @classmethod
-    def _score_card(cls, f: Dict) -> float:
+    def _score_card(cls, f: Dict) -> np.ndarray:
         """Score para card/box de destaque"""
-        score = 0.0
+        aspect = f['aspect_ratio']
+        area = f['area']
+        score = np.zeros(len(aspect))
         
         # Proporção quadrada
-        if 0.7 < f['aspect_ratio'] < 1.5: score += 0.3
+        score += 0.3 * ((aspect > 0.7) & (aspect < 1.5))
         
         # Área moderada
-        if 5000 < f['area'] < 100000: score += 0.2
+        score += 0.2 * ((area > 5000) & (area < 100000))
         
         # Conteúdo focado
-        if f['is_short']: score += 0.2
-        if f['has_bold']: score += 0.15
-        if f['word_count'] <= 50: score += 0.15
+        score += 0.2 * f['is_short']
+        score += 0.15 * f['has_bold']
+        score += 0.15 * (f['word_count'] <= 50)
         
-        return max(0, min(1, score))
+        return score
     
     @classmethod
-    def _score_caption(cls, f: Dict) -> float:
+    def _score_caption(cls, f: Dict) -> np.ndarray:
         """Score para legenda"""
-        score = 0.0
+        score = np.zeros(len(f['avg_font_size']))
         
-        if f['avg_font_size'] < 10: score += 0.3
-        if f['is_short']: score += 0.2
-        if f['has_italic']: score += 0.2
-        if f['word_count'] <= 20: score += 0.15
+        score += 0.3 * (f['avg_font_size'] < 10)
+        score += 0.2 * f['is_short']
+        score += 0.2 * f['has_italic']
+        score += 0.15 * (f['word_count'] <= 20)
         if 'figura' in f or 'tabela' in f or 'fonte:' in f: score += 0.15
         
-        return max(0, min(1, score))
+        return score
     
     @classmethod
-    def _score_footnote(cls, f: Dict) -> float:
+    def _score_footnote(cls, f: Dict) -> np.ndarray:
         """Score para nota de rodapé"""
-        score = 0.0
+        score = np.zeros(len(f['avg_font_size']))
         
-        if f['avg_font_size'] < 9: score += 0.4
-        if f['starts_with_number']: score += 0.2
-        if f['is_short']: score += 0.2
-        if f['word_count'] <= 30: score += 0.2
+        score += 0.4 * (f['avg_font_size'] < 9)
+        score += 0.2 * f['starts_with_number']
+        score += 0.2 * f['is_short']
+        score += 0.2 * (f['word_count'] <= 30)
         
-        return max(0, min(1, score))
+        return score
     
     @classmethod
     def extract_structured_list(cls, text: str) -> List[Dict]:
@@ -511,7 +862,7 @@ class IntelligentContentAnalyzer:
             indent_level = len(line) - len(line.lstrip())
             
             # Remove marcadores
-            clean = re.sub(r'^[•○●■□▪▫►▸⦿⦾\-\*→⇒»›✓✗\d+\.)\]]\s*', '', line)
+            clean = cls._strip_list_marker('', line)
             
             if clean:
                 items.append({
@@ -525,18 +876,19 @@ class IntelligentContentAnalyzer:
     @classmethod
     def extract_key_value_pairs(cls, text: str) -> Dict[str, str]:
         """Extrai pares chave-valor de texto estruturado"""
-        pairs = {}
-        
         # Padrão: "Chave: Valor"
-        matches = re.findall(r'([^:\n]+):\s*([^\n]+)', text)
-        for key, value in matches:
-            pairs[key.strip()] = value.strip()
-        
-        return pairs
+        return {
+            match.group(1).strip(): match.group(2).strip()
+            for match in cls._find_key_values(text)
+        }
 
 
 class AdvancedPDFExtractor:
-    """Extrator principal com IA e análise avançada"""
+    """Extrator principal com IA e análise avançada
+    
+    Não guarda estado entre documentos: uma instância pode ser reutilizada
+    para extrair vários PDFs.
+    """
     
     def __init__(self, method: str = "auto", enable_ocr: bool = False, 
                  log_callback=None, progress_callback=None):
@@ -545,120 +897,337 @@ class AdvancedPDFExtractor:
         self.log = log_callback or print
         self.progress = progress_callback or (lambda x: None)
     
-    def extract(self, pdf_path: Path) -> List[Dict]:
-        """Extrai dados com análise profunda de layout e conteúdo"""
+    def extract(self, pdf_path: Path, stream: Optional[bytes] = None) -> List[Dict]:
+        """Extrai dados com análise profunda de layout e conteúdo
+        
+        Se `stream` (conteúdo do PDF já lido) for informado, o PyMuPDF abre o
+        documento a partir da memória em vez de ler `pdf_path` novamente.
+        """
         
         self.log(f"🔍 Iniciando extração avançada: {pdf_path.name}")
         
-        doc = fitz.open(pdf_path)
-        pages_data = []
+        if self._use_pdfium():
+            pages_data = self._extract_pdfium(pdf_path, stream)
+            self.log(f"✅ Extração completa: {len(pages_data)} páginas processadas (pdfium)")
+            return pages_data
+        
+        doc = self._open_document(pdf_path, stream)
+        total_pages = len(doc)
+        pages_data = self._extract_range(doc, pdf_path, 0, total_pages)
+        doc.close()
+        
+        self.log(f"✅ Extração completa: {total_pages} páginas processadas")
+        return pages_data
+    
+    def extract_pages(self, pdf_path: Path, start: int, end: int,
+                      stream: Optional[bytes] = None) -> List[Dict]:
+        """Extrai apenas as páginas no intervalo [start, end) (índices a partir de 0)"""
+        if self._use_pdfium():
+            return self._extract_pdfium(pdf_path, stream, start, end)
+        
+        doc = self._open_document(pdf_path, stream)
+        pages_data = self._extract_range(doc, pdf_path, max(0, start), min(end, len(doc)))
+        doc.close()
+        return pages_data
+    
+    def extract_parallel(self, pdf_path: Path, workers: int,
+                         stream: Optional[bytes] = None) -> List[Dict]:
+        """Extrai intervalos de páginas em processos separados (PDFs grandes)
+        
+        PDFs com menos de PAGE_PARALLEL_MIN_PAGES páginas, ou com workers <= 1,
+        seguem pelo extract() sequencial.
+        """
+        doc = self._open_document(pdf_path, stream)
         total_pages = len(doc)
+        doc.close()
+        
+        workers = min(workers, total_pages)
+        if workers <= 1 or total_pages < PAGE_PARALLEL_MIN_PAGES:
+            return self.extract(pdf_path, stream)
+        
+        self.log(f"🔍 Iniciando extração avançada: {pdf_path.name} ({workers} processos)")
+        
+        # Intervalos contíguos, alguns por processo; os workers reabrem o arquivo
+        chunks = min(total_pages, workers * PAGE_PARALLEL_CHUNKS_PER_WORKER)
+        step = -(-total_pages // chunks)
+        ranges = [
+            (pdf_path, start, min(start + step, total_pages), self.method, self.enable_ocr)
+            for start in range(0, total_pages, step)
+        ]
+        
+        # Progresso conforme cada intervalo termina; a ordem das páginas é
+        # restaurada pelo índice do intervalo
+        parts = [None] * len(ranges)
+        done_pages = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_extract_page_range, args): index
+                for index, args in enumerate(ranges)
+            }
+            for future in as_completed(futures):
+                part = future.result()
+                parts[futures[future]] = part
+                done_pages += len(part)
+                self.progress(done_pages / total_pages)
+                self.log(f"📄 {done_pages}/{total_pages} páginas processadas")
         
-        for page_num in range(total_pages):
+        pages_data = [page for part in parts for page in part]
+        
+        self.log(f"✅ Extração completa: {total_pages} páginas processadas")
+        return pages_data
+    
+    def _use_pdfium(self) -> bool:
+        """Indica se o backend rápido de texto (pypdfium2) deve ser usado"""
+        if self.method != 'pdfium':
+            return False
+        if not PDFIUM_AVAILABLE:
+            self.log("⚠ pypdfium2 não instalado, usando PyMuPDF")
+            return False
+        return True
+    
+    def _extract_pdfium(self, pdf_path: Path, stream: Optional[bytes] = None,
+                        start: int = 0, end: Optional[int] = None) -> List[Dict]:
+        """Extração rápida só de texto via pypdfium2 (sem fontes, tabelas ou imagens)
+        
+        Os parágrafos viram zonas classificadas pelo IntelligentContentAnalyzer,
+        que sem métricas de fonte se apoia apenas nos padrões do texto.
+        """
+        pdf = pdfium.PdfDocument(stream if stream is not None else str(pdf_path))
+        total_pages = len(pdf)
+        end = total_pages if end is None else min(end, total_pages)
+        pages_data = []
+        
+        for page_num in range(max(0, start), end):
             self.progress((page_num + 1) / total_pages)
-            
-            page = doc[page_num]
             self.log(f"📄 Processando página {page_num + 1}/{total_pages}")
             
-            # Detector de layout inteligente
-            layout_detector = SmartLayoutDetector(page)
-            
-            # Extrai blocos de texto com metadados completos
-            text_blocks = self._extract_text_blocks_rich(page)
-            
-            # Detecta margens e grid
-            margins = layout_detector.detect_margins(text_blocks)
-            grid = layout_detector.detect_grid_system(text_blocks)
-            
-            # Detecta caixas visuais
-            visual_boxes = layout_detector.detect_visual_boxes()
+            page = pdf[page_num]
+            width, height = page.get_size()
+            textpage = page.get_textpage()
+            full_text = textpage.get_text_range().replace('\r\n', '\n')
+            textpage.close()
+            page.close()
             
-            # Cria zonas respeitando ordem de leitura
-            zones = layout_detector.detect_reading_order_zones(text_blocks)
+            zones = []
+            for paragraph in re.split(r'\n\s*\n', full_text):
+                paragraph = paragraph.strip()
+                if not paragraph:
+                    continue
+                
+                zones.append({
+                    'x0': 0, 'y0': 0, 'x1': width, 'y1': 0,
+                    'width': width, 'height': 0,
+                    'text': paragraph,
+                    'blocks': [],
+                    'block_count': 1
+                })
             
-            # Classifica cada zona com IA
-            for zone in zones:
-                classification = IntelligentContentAnalyzer.classify_zone_advanced(zone)
+            # Classifica os parágrafos da página em lote
+            for zone, classification in zip(zones, IntelligentContentAnalyzer.classify_zones(zones)):
                 zone.update(classification)
             
-            # Extrai tabelas com múltiplos métodos
-            tables = self._extract_tables_advanced(pdf_path, page_num + 1, page)
-            
-            # Extrai imagens com análise
-            images = self._extract_images_advanced(page)
-            
-            # Detecta headers e footers
-            header_footer = self._detect_header_footer(text_blocks, page.rect.height)
-            
-            # Extrai metadados da página
-            page_metadata = {
+            pages_data.append({
                 'page': page_num + 1,
-                'width': layout_detector.width,
-                'height': layout_detector.height,
-                'margins': margins,
-                'grid': grid,
-                'text_blocks': [self._block_to_export(b) for b in text_blocks],
+                'width': width,
+                'height': height,
+                'margins': {'left': 0, 'right': width, 'top': 0, 'bottom': height},
+                'grid': {'columns': [], 'rows': [], 'grid_detected': False},
+                'text_blocks': [],
                 'zones': zones,
-                'visual_boxes': visual_boxes,
-                'tables': tables,
-                'images': images,
-                'header_footer': header_footer,
-                'full_text': page.get_text(),
-                'has_images': len(images) > 0,
-                'has_tables': len(tables) > 0,
-                'dominant_font_size': self._get_dominant_font_size(text_blocks)
-            }
-            
-            pages_data.append(page_metadata)
+                'visual_boxes': [],
+                'tables': [],
+                'images': [],
+                'header_footer': {'header': None, 'footer': None},
+                'full_text': full_text,
+                'has_images': False,
+                'has_tables': False,
+                'dominant_font_size': 12.0
+            })
+        
+        pdf.close()
+        return pages_data
+    
+    def _open_document(self, pdf_path: Path, stream: Optional[bytes] = None):
+        """Abre o PDF a partir do caminho ou dos bytes já lidos"""
+        if stream is not None:
+            return fitz.open(stream=stream, filetype="pdf")
+        return fitz.open(pdf_path)
+    
+    def iter_extract(self, pdf_path: Path, stream: Optional[bytes] = None) -> Iterator[Dict]:
+        """Como extract(), mas entrega uma página por vez
         
-        doc.close()
+        Para documentos grandes: combinado com analyze_document_structure e
+        export_markdown (que aceitam iteráveis), só a página atual fica em memória.
+        O documento é fechado ao fim da iteração (ou quando o gerador é descartado).
+        """
+        self.log(f"🔍 Iniciando extração avançada: {pdf_path.name}")
+        
+        if self._use_pdfium():
+            pages_data = self._extract_pdfium(pdf_path, stream)
+            yield from pages_data
+            self.log(f"✅ Extração completa: {len(pages_data)} páginas processadas (pdfium)")
+            return
+        
+        doc = self._open_document(pdf_path, stream)
+        try:
+            total_pages = len(doc)
+            yield from self._iter_range(doc, pdf_path, 0, total_pages)
+        finally:
+            doc.close()
         
         self.log(f"✅ Extração completa: {total_pages} páginas processadas")
-        return pages_data
     
-    def _extract_text_blocks_rich(self, page) -> List[TextBlock]:
-        """Extrai blocos de texto com metadados completos"""
-        text_dict = page.get_text("dict")
+    def _extract_range(self, doc, pdf_path: Path, start: int, end: int) -> List[Dict]:
+        """Extrai as páginas [start, end) de um documento já aberto"""
+        return list(self._iter_range(doc, pdf_path, start, end))
+    
+    def _iter_range(self, doc, pdf_path: Path, start: int, end: int) -> Iterator[Dict]:
+        """Gera as páginas [start, end) de um documento já aberto, uma a uma"""
+        total_pages = len(doc)
+        
+        # pdfplumber aberto uma vez para o intervalo, não a cada página
+        plumber_pdf = self._open_plumber(pdf_path)
+        
+        # (MD5, componentes de cor) do pixmap por xref, válido para o documento todo:
+        # uma imagem repetida em várias páginas (logo, marca d'água) é decodificada uma vez
+        image_pixmaps = {}
+        try:
+            for page_num in range(start, end):
+                self.progress((page_num + 1) / total_pages)
+                
+                page = doc[page_num]
+                self.log(f"📄 Processando página {page_num + 1}/{total_pages}")
+                
+                # Detector de layout inteligente
+                layout_detector = SmartLayoutDetector(page)
+                
+                # Uma única análise de texto do MuPDF por página: o dict alimenta blocos
+                # e detecção manual de tabelas, e o texto corrido sai do mesmo textpage
+                textpage = page.get_textpage(flags=fitz.TEXTFLAGS_DICT)
+                text_dict = page.get_text("dict", textpage=textpage)
+                full_text = page.get_text(textpage=textpage)
+                
+                # Página escaneada (imagem, quase sem texto): nada de tabelas para achar,
+                # o texto fica para o OCR; as imagens são listadas normalmente
+                scanned = (len(full_text.strip()) < SCANNED_TEXT_MAX_CHARS
+                           and bool(page.get_images()))
+                if scanned:
+                    self.log("  🖼 Página escaneada: tabelas ignoradas")
+                
+                # Extrai blocos de texto com metadados completos
+                text_blocks = self._extract_text_blocks_rich(page, text_dict)
+                
+                # Detecta margens e grid
+                margins = layout_detector.detect_margins(text_blocks)
+                grid = layout_detector.detect_grid_system(text_blocks)
+                
+                # Detecta caixas visuais
+                visual_boxes = layout_detector.detect_visual_boxes()
+                
+                # Cria zonas respeitando ordem de leitura
+                zones = layout_detector.detect_reading_order_zones(text_blocks)
+                
+                # Classifica as zonas da página com IA (em lote)
+                for zone, classification in zip(zones, IntelligentContentAnalyzer.classify_zones(zones)):
+                    zone.update(classification)
+                
+                # Blocos exportados uma vez (os mesmos dicts das zonas)
+                block_dicts = layout_detector.export_blocks(text_blocks)
+                
+                # Detecta headers e footers
+                header_footer = self._detect_header_footer(text_blocks, page.rect.height,
+                                                           block_dicts)
+                dominant_font_size = self._get_dominant_font_size(text_blocks)
+                
+                # Daqui em diante só os dicts: os TextBlock da página podem ser liberados
+                # antes da extração de tabelas e imagens
+                del text_blocks
+                
+                # Extrai tabelas com múltiplos métodos (nenhuma em página escaneada)
+                tables = [] if scanned else self._extract_tables_advanced(
+                    pdf_path, page_num + 1, page, text_dict, plumber_pdf)
+                
+                # Extrai imagens com análise
+                images = self._extract_images_advanced(page, image_pixmaps)
+                
+                # Extrai metadados da página
+                page_metadata = {
+                    'page': page_num + 1,
+                    'width': layout_detector.width,
+                    'height': layout_detector.height,
+                    'margins': margins,
+                    'grid': grid,
+                    'text_blocks': block_dicts,
+                    'zones': zones,
+                    'visual_boxes': visual_boxes,
+                    'tables': tables,
+                    'images': images,
+                    'header_footer': header_footer,
+                    'full_text': full_text,
+                    'has_images': len(images) > 0,
+                    'has_tables': len(tables) > 0,
+                    'dominant_font_size': dominant_font_size
+                }
+                
+                if scanned:
+                    page_metadata['scanned'] = True
+                
+                yield page_metadata
+            
+        finally:
+            if plumber_pdf is not None:
+                plumber_pdf.close()
+    
+    def _extract_text_blocks_rich(self, page, text_dict: Optional[Dict] = None) -> TextBlockList:
+        """Extrai blocos de texto com metadados completos (text_dict: get_text("dict") já feito)"""
+        if text_dict is None:
+            text_dict = page.get_text("dict")
         blocks = []
+        bboxes = []
         
         for block in text_dict.get("blocks", []):
             if "lines" not in block:
                 continue
             
+            # Uma passada pelos spans: soma de tamanhos, contagens de fonte/cor e
+            # OR das flags (sem listas paralelas nem Counter por bloco)
             block_texts = []
-            font_sizes = []
-            font_names = []
-            colors = []
-            flags_list = []
+            font_size_total = 0.0
+            font_counts = {}
+            color_counts = {}
+            flags = 0
             
             for line in block["lines"]:
                 for span in line["spans"]:
                     block_texts.append(span["text"])
-                    font_sizes.append(span["size"])
-                    font_names.append(span["font"])
-                    colors.append(span["color"])
-                    flags_list.append(span.get("flags", 0))
+                    font_size_total += span["size"]
+                    font = span["font"]
+                    font_counts[font] = font_counts.get(font, 0) + 1
+                    color = span["color"]
+                    color_counts[color] = color_counts.get(color, 0) + 1
+                    flags |= span.get("flags", 0)
             
             if not block_texts:
                 continue
             
-            # Calcula médias e detecta ênfases
-            avg_font_size = sum(font_sizes) / len(font_sizes)
-            dominant_font = Counter(font_names).most_common(1)[0][0] if font_names else ""
-            dominant_color = Counter(colors).most_common(1)[0][0] if colors else 0
+            # Calcula médias e detecta ênfases (empates: o primeiro visto, como no Counter)
+            avg_font_size = font_size_total / len(block_texts)
+            dominant_font = max(font_counts, key=font_counts.get)
+            dominant_color = max(color_counts, key=color_counts.get)
             
             # Flags: bit 0 = superscript, 1 = italic, 2 = serifed, 4 = bold
-            is_bold = any(f & 2**4 for f in flags_list)
-            is_italic = any(f & 2**1 for f in flags_list)
+            is_bold = bool(flags & 2**4)
+            is_italic = bool(flags & 2**1)
             
             # Detecta peso da fonte pelo nome
             font_weight = 'bold' if 'bold' in dominant_font.lower() else 'normal'
             
+            bbox = block['bbox']
             text_block = TextBlock(
-                x0=block['bbox'][0],
-                y0=block['bbox'][1],
-                x1=block['bbox'][2],
-                y1=block['bbox'][3],
+                x0=bbox[0],
+                y0=bbox[1],
+                x1=bbox[2],
+                y1=bbox[3],
                 text=' '.join(block_texts),
                 font_size=avg_font_size,
                 font_name=dominant_font,
@@ -669,8 +1238,9 @@ class AdvancedPDFExtractor:
             )
             
             blocks.append(text_block)
+            bboxes.append(bbox)
         
-        return blocks
+        return TextBlockList(blocks, np.array(bboxes, dtype=np.float64))
     
     def _block_to_export(self, block: TextBlock) -> Dict:
         """Converte TextBlock para formato exportável"""
@@ -686,47 +1256,91 @@ class AdvancedPDFExtractor:
             'is_italic': block.is_italic
         }
     
-    def _extract_tables_advanced(self, pdf_path: Path, page_num: int, page) -> List[Dict]:
-        """Extração avançada de tabelas com fallback e validação"""
+    def _open_plumber(self, pdf_path: Path):
+        """Abre o PDF no pdfplumber uma vez para várias páginas (None se indisponível)"""
+        if not PDFPLUMBER_AVAILABLE:
+            return None
+        try:
+            return pdfplumber.open(pdf_path)
+        except Exception as e:
+            # Sem o documento aberto, cada página tenta abrir (e registra o erro) sozinha
+            self.log(f"  ⚠ PDFPlumber erro: {e}")
+            return None
+    
+    def _extract_plumber_tables(self, pdf_page) -> List[Dict]:
+        """Tabelas de uma página do pdfplumber, tentando as estratégias em ordem"""
+        tables = []
+        
+        # Sem traços horizontais suficientes, as estratégias por linhas não formam
+        # duas linhas de células; as bordas já ficam em cache para extract_tables
+        strategies = ['lines', 'lines_strict', 'text']
+        if len({edge['top'] for edge in pdf_page.horizontal_edges}) < TABLE_MIN_HORIZONTAL_EDGES:
+            strategies = ['text']
+        
+        # Tenta com diferentes configurações
+        for strategy in strategies:
+            extracted = pdf_page.extract_tables({
+                'vertical_strategy': strategy,
+                'horizontal_strategy': strategy,
+                'intersection_tolerance': 3
+            })
+            
+            for table in extracted:
+                if table and len(table) > 1:
+                    validated = self._validate_table(table)
+                    if validated:
+                        tables.append({
+                            'method': f'pdfplumber_{strategy}',
+                            'headers': validated['headers'],
+                            'rows': validated['rows'],
+                            'quality': 90,
+                            'columns': len(validated['headers']),
+                            'rows_count': len(validated['rows'])
+                        })
+            
+            if tables:
+                break  # Se encontrou, não precisa tentar outras estratégias
+        
+        return tables
+    
+    def _extract_tables_advanced(self, pdf_path: Path, page_num: int, page,
+                                 text_dict: Optional[Dict] = None,
+                                 plumber_pdf=None) -> List[Dict]:
+        """Extração avançada de tabelas com fallback e validação
+        
+        plumber_pdf: documento pdfplumber já aberto (evita reabrir o PDF por página)
+        """
         tables = []
         
+        # Sem traços nem vocabulário de tabela, pdfplumber e Camelot só gastariam tempo
+        probe_libraries = self._may_contain_tables(page, text_dict)
+        
         # Método 1: pdfplumber (melhor para tabelas com linhas)
-        if PDFPLUMBER_AVAILABLE:
+        if PDFPLUMBER_AVAILABLE and probe_libraries:
             try:
-                import pdfplumber
-                with pdfplumber.open(pdf_path) as pdf:
-                    pdf_page = pdf.pages[page_num - 1]
-                    
-                    # Tenta com diferentes configurações
-                    for strategy in ['lines', 'lines_strict', 'text']:
-                        extracted = pdf_page.extract_tables({
-                            'vertical_strategy': strategy,
-                            'horizontal_strategy': strategy,
-                            'intersection_tolerance': 3
-                        })
-                        
-                        for table in extracted:
-                            if table and len(table) > 1:
-                                validated = self._validate_table(table)
-                                if validated:
-                                    tables.append({
-                                        'method': f'pdfplumber_{strategy}',
-                                        'headers': validated['headers'],
-                                        'rows': validated['rows'],
-                                        'quality': 90,
-                                        'columns': len(validated['headers']),
-                                        'rows_count': len(validated['rows'])
-                                    })
-                        
-                        if tables:
-                            break  # Se encontrou, não precisa tentar outras estratégias
+                if plumber_pdf is not None:
+                    pdf_page = plumber_pdf.pages[page_num - 1]
+                    try:
+                        tables = self._extract_plumber_tables(pdf_page)
+                    finally:
+                        # Libera os objetos em cache da página; o PDF segue aberto.
+                        # flush_cache existe desde o pdfplumber 0.10 (Page.close só no 0.11)
+                        pdf_page.flush_cache()
+                        textmap_cache_clear = getattr(getattr(pdf_page, 'get_textmap', None),
+                                                      'cache_clear', None)
+                        if textmap_cache_clear is not None:
+                            textmap_cache_clear()
+                else:
+                    import pdfplumber
+                    with pdfplumber.open(pdf_path) as pdf:
+                        tables = self._extract_plumber_tables(pdf.pages[page_num - 1])
                 
                 self.log(f"  ✓ pdfplumber encontrou {len(tables)} tabela(s)")
             except Exception as e:
                 self.log(f"  ⚠ PDFPlumber erro: {e}")
         
         # Método 2: Camelot (fallback ou adicional)
-        if not tables and CAMELOT_AVAILABLE:
+        if not tables and CAMELOT_AVAILABLE and probe_libraries:
             try:
                 # Lattice (para tabelas com bordas)
                 extracted = camelot.read_pdf(
@@ -779,13 +1393,33 @@ class AdvancedPDFExtractor:
         
         # Método 3: Detecção manual por análise de texto estruturado
         if not tables:
-            manual_tables = self._detect_tables_by_structure(page)
+            manual_tables = self._detect_tables_by_structure(page, text_dict)
             if manual_tables:
                 tables.extend(manual_tables)
                 self.log(f"  ✓ Detecção manual encontrou {len(manual_tables)} tabela(s)")
         
         return tables
     
+    def _may_contain_tables(self, page, text_dict: Optional[Dict] = None) -> bool:
+        """Sondagem barata: a página tem traços de tabela ou palavras típicas de tabela?"""
+        rules = 0
+        for drawing in page.get_cdrawings():
+            for item in drawing['items']:
+                if item[0] in ('l', 're'):
+                    rules += 1
+                    if rules >= TABLE_MIN_RULES:
+                        return True
+        
+        if text_dict is None:
+            text_dict = page.get_text("dict")
+        text = ' '.join(
+            span['text']
+            for block in text_dict.get('blocks', []) if 'lines' in block
+            for line in block['lines']
+            for span in line['spans']
+        )
+        return IntelligentContentAnalyzer._has_table_word(text.lower()) is not None
+    
     def _validate_table(self, table_data: List[List]) -> Optional[Dict]:
         """Valida e limpa dados de tabela"""
         if not table_data or len(table_data) < 2:
@@ -794,8 +1428,9 @@ class AdvancedPDFExtractor:
         # Remove linhas completamente vazias
         cleaned_rows = []
         for row in table_data:
-            if any(str(cell).strip() for cell in row):
-                cleaned_row = [str(cell).strip() for cell in row]
+            # Converte e limpa cada célula uma única vez
+            cleaned_row = [str(cell).strip() for cell in row]
+            if any(cleaned_row):
                 cleaned_rows.append(cleaned_row)
         
         if len(cleaned_rows) < 2:
@@ -823,37 +1458,44 @@ class AdvancedPDFExtractor:
             'rows': valid_rows
         }
     
-    def _detect_tables_by_structure(self, page) -> List[Dict]:
+    def has_table_hint(self, page) -> bool:
+        """Indício rápido de tabela na página (sem pdfplumber/camelot)"""
+        return bool(self._detect_tables_by_structure(page))
+    
+    def _detect_tables_by_structure(self, page, text_dict: Optional[Dict] = None) -> List[Dict]:
         """Detecta tabelas por análise de estrutura de texto"""
         tables = []
-        text_dict = page.get_text("dict")
+        if text_dict is None:
+            text_dict = page.get_text("dict")
         
-        # Agrupa blocos por linha Y (tolerância de 5px)
-        lines_dict = defaultdict(list)
+        # Spans com o Y da linha a que pertencem
+        line_ys = []
+        spans = []
         
         for block in text_dict.get("blocks", []):
             if "lines" not in block:
                 continue
             
             for line in block["lines"]:
-                y_pos = int(line["bbox"][1] / 5) * 5  # Agrupa por linha
-                
+                y = line["bbox"][1]
                 for span in line["spans"]:
-                    lines_dict[y_pos].append({
-                        'x': span["bbox"][0],
-                        'text': span["text"].strip(),
-                        'size': span["size"]
-                    })
+                    line_ys.append(y)
+                    spans.append(span)
         
         # Detecta padrões tabulares (múltiplas linhas com múltiplos elementos alinhados)
         current_table = []
         
-        for y_pos in sorted(lines_dict.keys()):
-            line_items = sorted(lines_dict[y_pos], key=lambda x: x['x'])
-            
+        for row_spans in self._group_spans_by_row(line_ys, spans):
             # Se tem 3+ itens alinhados horizontalmente, pode ser linha de tabela
-            if len(line_items) >= 3:
-                current_table.append(line_items)
+            if len(row_spans) >= 3:
+                current_table.append([
+                    {
+                        'x': span["bbox"][0],
+                        'text': span["text"].strip(),
+                        'size': span["size"]
+                    }
+                    for span in row_spans
+                ])
             else:
                 # Finaliza tabela se tinha conteúdo
                 if len(current_table) >= 3:
@@ -870,6 +1512,29 @@ class AdvancedPDFExtractor:
         
         return tables
     
+    def _group_spans_by_row(self, line_ys: List[float], spans: List[Dict]) -> List[List[Dict]]:
+        """Agrupa spans por linha Y (tolerância de 5px): linhas de cima para baixo,
+        spans da esquerda para a direita (empates na ordem do texto)"""
+        if len(spans) < NUMPY_MIN_ITEMS:
+            lines_dict = defaultdict(list)
+            for y, span in zip(line_ys, spans):
+                lines_dict[int(y / 5) * 5].append(span)  # Agrupa por linha
+            
+            return [
+                sorted(lines_dict[y_pos], key=lambda span: span["bbox"][0])
+                for y_pos in sorted(lines_dict.keys())
+            ]
+        
+        # Uma ordenação estável por (linha, x) e cortes onde a linha muda; astype
+        # trunca em direção a zero, como int()
+        y_bucket = (np.asarray(line_ys, dtype=np.float64) / 5).astype(np.int64) * 5
+        x = np.array([span["bbox"][0] for span in spans], dtype=np.float64)
+        order = np.lexsort((x, y_bucket))
+        
+        ordered = [spans[i] for i in order.tolist()]
+        bounds = [0] + (np.flatnonzero(np.diff(y_bucket[order])) + 1).tolist() + [len(ordered)]
+        return [ordered[start:end] for start, end in zip(bounds, bounds[1:])]
+    
     def _structure_manual_table(self, table_lines: List[List[Dict]]) -> Optional[Dict]:
         """Estrutura tabela detectada manualmente"""
         if len(table_lines) < 3:
@@ -883,15 +1548,18 @@ class AdvancedPDFExtractor:
             return None
         
         # Primeira linha como headers
-        headers = [item['text'] for item in table_lines[0][:avg_cols]]
+        get_text = itemgetter('text')
+        headers = list(map(get_text, table_lines[0][:avg_cols]))
+        ncols = len(headers)
         
         # Demais linhas como dados
         rows = []
         for line in table_lines[1:]:
-            row = [item['text'] for item in line[:avg_cols]]
+            row = list(map(get_text, line[:avg_cols]))
             # Preenche colunas faltantes
-            while len(row) < len(headers):
-                row.append('')
+            pad = ncols - len(row)
+            if pad > 0:
+                row.extend([''] * pad)
             rows.append(row)
         
         return {
@@ -903,21 +1571,44 @@ class AdvancedPDFExtractor:
             'rows_count': len(rows)
         }
     
-    def _extract_images_advanced(self, page) -> List[Dict]:
-        """Extrai informações avançadas de imagens"""
+    def _extract_images_advanced(self, page,
+                                 image_pixmaps: Optional[Dict[int, Tuple[bytes, object]]] = None
+                                 ) -> List[Dict]:
+        """Extrai informações avançadas de imagens
+        
+        Formato e tamanho vêm da lista de imagens e do dicionário do stream, e o
+        espaço de cor (número de componentes, como em extract_image) do pixmap já
+        usado para localizar a imagem: sem extract_image, que lê o stream e
+        converte para PNG o que não for JPEG/JPX/JBIG2.
+        
+        image_pixmaps (xref -> (MD5, componentes)) é compartilhado entre as páginas
+        do mesmo documento, para que cada xref seja decodificado uma só vez.
+        """
+        if image_pixmaps is None:
+            image_pixmaps = {}
         images = []
+        doc = page.parent
         
         image_list = page.get_images(full=True)
         
+        # Posições das imagens da página agrupadas pelo MD5 do pixmap (o mesmo
+        # casamento que get_image_rects faz, mas com o MD5 de cada xref memorizado)
+        rects_by_digest = self._image_rects_by_digest(page) if image_list else {}
+        
         for img_index, img in enumerate(image_list):
             try:
                 xref = img[0]
                 
-                # Pega informações da imagem
-                img_dict = page.parent.extract_image(xref)
+                # Pega informações da imagem: (xref, smask, w, h, bpc, cs, alt_cs, nome, filtro, ...)
+                image_format = _IMAGE_FILTER_EXT.get(img[8], 'png')
+                size_bytes = self._image_stream_size(doc, xref)
                 
-                # Posição na página
-                img_rects = page.get_image_rects(img)
+                # Posição na página (e componentes de cor do mesmo pixmap)
+                pixmap_info = image_pixmaps.get(xref)
+                if pixmap_info is None:
+                    pixmap_info = image_pixmaps[xref] = self._pixmap_info(doc, xref, img[5])
+                digest, colorspace = pixmap_info
+                img_rects = rects_by_digest.get(digest, [])
                 
                 for rect in img_rects:
                     image_info = {
@@ -930,22 +1621,65 @@ class AdvancedPDFExtractor:
                         'width': rect.width,
                         'height': rect.height,
                         'area': rect.width * rect.height,
-                        'format': img_dict.get('ext', 'unknown'),
-                        'colorspace': img_dict.get('colorspace', 'unknown'),
-                        'size_bytes': len(img_dict.get('image', b'')),
+                        'format': image_format,
+                        'colorspace': colorspace,
+                        'size_bytes': size_bytes,
                         'aspect_ratio': rect.width / rect.height if rect.height > 0 else 0
                     }
                     
-                    # Classifica tipo de imagem
-                    image_info['type'] = self._classify_image(image_info)
-                    
                     images.append(image_info)
                     
             except Exception as e:
                 self.log(f"  ⚠ Erro ao extrair imagem {img_index}: {e}")
         
+        # Classifica tipo de imagem (todas as da página de uma vez)
+        for image_info, image_type in zip(images, self._classify_images(images)):
+            image_info['type'] = image_type
+        
         return images
     
+    def _pixmap_info(self, doc, xref: int, colorspace_name: str) -> Tuple[bytes, object]:
+        """(MD5, componentes de cor) do pixmap da imagem, numa única decodificação"""
+        pix = fitz.Pixmap(doc, xref)
+        components = pix.n - pix.alpha
+        if pix.colorspace is None or components <= 0:
+            components = _COLORSPACE_COMPONENTS.get(colorspace_name, 'unknown')
+        return pix.digest, components
+    
+    def _image_rects_by_digest(self, page) -> Dict[bytes, List]:
+        """Retângulos das imagens da página indexados pelo MD5 do pixmap"""
+        rects_by_digest = defaultdict(list)
+        for info in page.get_image_info(hashes=True):
+            rects_by_digest[info['digest']].append(fitz.Rect(info['bbox']))
+        return rects_by_digest
+    
+    def _classify_images(self, images: List[Dict]) -> List[str]:
+        """_classify_image para várias imagens; com muitas, as regras viram máscaras NumPy"""
+        if len(images) < NUMPY_MIN_ITEMS:
+            return [self._classify_image(img_info) for img_info in images]
+        
+        aspect_ratio = np.array([img['aspect_ratio'] for img in images], dtype=np.float64)
+        area = np.array([img['area'] for img in images], dtype=np.float64)
+        
+        # Mesma ordem das regras de _classify_image: vale a primeira que casar
+        conditions = [
+            (area < 10000) & (0.8 < aspect_ratio) & (aspect_ratio < 1.2),
+            area < 2000,
+            aspect_ratio > 3,
+            (10000 < area) & (area < 200000),
+            area > 100000,
+        ]
+        choices = ['logo', 'icon', 'banner', 'chart', 'photo']
+        return np.select(conditions, choices, default='figure').tolist()
+    
+    def _image_stream_size(self, doc, xref: int) -> int:
+        """Tamanho do stream da imagem no arquivo (comprimido), pelo /Length"""
+        kind, value = doc.xref_get_key(xref, 'Length')
+        if kind == 'int':
+            return int(value)
+        # /Length indireto ou ausente: lê o stream cru, ainda sem decodificar
+        return len(doc.xref_stream_raw(xref) or b'')
+    
     def _classify_image(self, img_info: Dict) -> str:
         """Classifica tipo de imagem por características"""
         aspect_ratio = img_info['aspect_ratio']
@@ -973,23 +1707,36 @@ class AdvancedPDFExtractor:
         
         return 'figure'
     
-    def _detect_header_footer(self, text_blocks: List[TextBlock], page_height: float) -> Dict:
-        """Detecta headers e footers por posição"""
-        header_zone = page_height * 0.1  # 10% superior
-        footer_zone = page_height * 0.9  # 10% inferior
-        
-        header_blocks = [b for b in text_blocks if b.y1 < header_zone]
-        footer_blocks = [b for b in text_blocks if b.y0 > footer_zone]
+    def _detect_header_footer(self, text_blocks: List[TextBlock], page_height: float,
+                              block_dicts: Optional[List[Dict]] = None) -> Dict:
+        """Detecta headers e footers por posição
+        
+        block_dicts: blocos já exportados, na mesma ordem de text_blocks (reaproveitados)
+        """
+        header_zone = page_height * HEADER_ZONE_FRACTION
+        footer_zone = page_height * FOOTER_ZONE_FRACTION
+        
+        if block_dicts is None:
+            block_dicts = [self._block_to_export(b) for b in text_blocks]
+        
+        bboxes = getattr(text_blocks, 'bboxes', None)
+        if bboxes is not None:
+            # Máscaras sobre as colunas y0/y1 do array da TextBlockList
+            header_idx = np.flatnonzero(bboxes[:, 3] < header_zone).tolist()
+            footer_idx = np.flatnonzero(bboxes[:, 1] > footer_zone).tolist()
+        else:
+            header_idx = [i for i, b in enumerate(text_blocks) if b.y1 < header_zone]
+            footer_idx = [i for i, b in enumerate(text_blocks) if b.y0 > footer_zone]
         
         return {
             'header': {
-                'text': ' '.join(b.text for b in header_blocks),
-                'blocks': [self._block_to_export(b) for b in header_blocks]
-            } if header_blocks else None,
+                'text': ' '.join(text_blocks[i].text for i in header_idx),
+                'blocks': [block_dicts[i] for i in header_idx]
+            } if header_idx else None,
             'footer': {
-                'text': ' '.join(b.text for b in footer_blocks),
-                'blocks': [self._block_to_export(b) for b in footer_blocks]
-            } if footer_blocks else None
+                'text': ' '.join(text_blocks[i].text for i in footer_idx),
+                'blocks': [block_dicts[i] for i in footer_idx]
+            } if footer_idx else None
         }
     
     def _get_dominant_font_size(self, text_blocks: List[TextBlock]) -> float:
@@ -998,58 +1745,82 @@ class AdvancedPDFExtractor:
             return 12.0
         
         font_sizes = [b.font_size for b in text_blocks]
-        return Counter(font_sizes).most_common(1)[0][0]
+        if len(font_sizes) < NUMPY_MIN_ITEMS:
+            return Counter(font_sizes).most_common(1)[0][0]
+        
+        # Moda em NumPy sobre os tamanhos exatos (sem arredondar para baldes);
+        # no empate vence o que aparece primeiro, como no Counter
+        _, first_index, counts = np.unique(np.asarray(font_sizes, dtype=np.float64),
+                                           return_index=True, return_counts=True)
+        return font_sizes[int(first_index[counts == counts.max()].min())]
     
     def extract_with_ocr(self, pdf_path: Path, pages: Optional[List[int]] = None) -> List[Dict]:
         """Extrai com OCR para PDFs escaneados"""
-        # Placeholder para implementação futura com Tesseract/EasyOCR
+        # Placeholder para implementação futura com Tesseract/EasyOCR; as páginas
+        # marcadas como 'scanned' na extração são as que o OCR deve processar
         self.log("⚠ OCR ainda não implementado")
-        return self.extract(pdf_path)
+        pages_data = self.extract(pdf_path)
+        scanned = [p['page'] for p in pages_data if p.get('scanned')]
+        if scanned:
+            self.log(f"🖼 Páginas escaneadas aguardando OCR: {scanned}")
+        return pages_data
     
-    def analyze_document_structure(self, pages_data: List[Dict]) -> Dict:
-        """Analisa estrutura geral do documento"""
-        
-        total_pages = len(pages_data)
-        
-        # Coleta estatísticas
-        all_zones = []
-        all_tables = []
-        all_images = []
-        zone_types = []
-        
-        for page in pages_data:
-            all_zones.extend(page['zones'])
-            all_tables.extend(page['tables'])
-            all_images.extend(page['images'])
-            zone_types.extend([z['type'] for z in page['zones']])
-        
-        # Análise de tipografia
-        font_sizes = []
-        for page in pages_data:
-            for block in page['text_blocks']:
-                font_sizes.append(block['font_size'])
+    def analyze_document_structure(self, pages_data: Iterable[Dict]) -> Dict:
+        """Analisa estrutura geral do documento
+        
+        pages_data pode ser qualquer iterável (inclusive um gerador de páginas):
+        as estatísticas são acumuladas numa única passada, só com contagens,
+        sem guardar listas de zonas, tabelas, imagens ou tamanhos de fonte.
+        """
+        
+        zone_counts = Counter()
+        size_counts = Counter()
+        totals = {'pages': 0, 'tables': 0, 'images': 0}
+        
+        def font_sizes():
+            # Percorre as páginas uma vez: conta zonas/tabelas/imagens e entrega
+            # os tamanhos de fonte para a soma, contando cada um
+            for page in pages_data:
+                totals['pages'] += 1
+                zone_counts.update(z['type'] for z in page['zones'])
+                totals['tables'] += len(page['tables'])
+                totals['images'] += len(page['images'])
+                # Análise de tipografia: Counter.update conta a página de uma vez (em C)
+                sizes = [block['font_size'] for block in page['text_blocks']]
+                size_counts.update(sizes)
+                yield from sizes
+        
+        # sum() sobre a mesma sequência de antes: mesmo arredondamento da média
+        font_size_total = sum(font_sizes())
+        font_size_count = sum(size_counts.values())
+        
+        total_pages = totals['pages']
+        table_count = totals['tables']
+        image_count = totals['images']
+        total_zones = sum(zone_counts.values())
         
         return {
             'total_pages': total_pages,
-            'total_zones': len(all_zones),
-            'total_tables': len(all_tables),
-            'total_images': len(all_images),
-            'zone_type_distribution': dict(Counter(zone_types)),
-            'avg_zones_per_page': len(all_zones) / total_pages if total_pages > 0 else 0,
-            'has_tables': len(all_tables) > 0,
-            'has_images': len(all_images) > 0,
+            'total_zones': total_zones,
+            'total_tables': table_count,
+            'total_images': image_count,
+            'zone_type_distribution': dict(zone_counts),
+            'avg_zones_per_page': total_zones / total_pages if total_pages > 0 else 0,
+            'has_tables': table_count > 0,
+            'has_images': image_count > 0,
             'typography': {
-                'min_font_size': min(font_sizes) if font_sizes else 0,
-                'max_font_size': max(font_sizes) if font_sizes else 0,
-                'avg_font_size': sum(font_sizes) / len(font_sizes) if font_sizes else 0,
-                'common_sizes': dict(Counter(font_sizes).most_common(5))
+                # min/max sobre os tamanhos distintos: mesmo resultado, menos itens
+                'min_font_size': min(size_counts) if size_counts else 0,
+                'max_font_size': max(size_counts) if size_counts else 0,
+                'avg_font_size': font_size_total / font_size_count if size_counts else 0,
+                'common_sizes': dict(size_counts.most_common(5))
             },
-            'document_type': self._infer_document_type(zone_types, len(all_tables), len(all_images))
+            'document_type': self._infer_document_type(zone_counts, table_count, image_count)
         }
     
-    def _infer_document_type(self, zone_types: List[str], table_count: int, image_count: int) -> str:
-        """Infere tipo de documento baseado em características"""
-        type_counts = Counter(zone_types)
+    def _infer_document_type(self, type_counts: Dict[str, int], table_count: int,
+                             image_count: int) -> str:
+        """Infere tipo de documento baseado em características (contagem por tipo de zona)"""
         
         # Documento acadêmico/científico
         if table_count > 5 or (table_count > 2 and type_counts.get('paragraph', 0) > 10):
@@ -1073,65 +1844,80 @@ class AdvancedPDFExtractor:
         
         return 'generic_document'
     
-    def export_markdown(self, pages_data: List[Dict], output_path: Path):
-        """Exporta para Markdown estruturado"""
-        md_lines = []
+    def export_markdown(self, pages_data: Iterable[Dict], output_path: Path):
+        """Exporta para Markdown estruturado
+        
+        Escreve página a página: aceita qualquer iterável (inclusive um
+        gerador) e só mantém em memória as linhas da página atual.
+        """
+        with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            separator = ''
+            for page_data in pages_data:
+                f.write(separator)
+                f.write('\n'.join(self._page_markdown_lines(page_data)))
+                separator = '\n'
         
-        for page_data in pages_data:
-            md_lines.append(f"\n---\n## Página {page_data['page']}\n")
+        self.log(f"✅ Markdown exportado: {output_path}")
+    
+    @staticmethod
+    def _page_markdown_lines(page_data: Dict) -> List[str]:
+        """Linhas Markdown de uma página"""
+        md_lines = [f"\n---\n## Página {page_data['page']}\n"]
+        
+        for zone in page_data['zones']:
+            zone_type = zone['type']
+            text = zone['text'].strip()
             
-            for zone in page_data['zones']:
-                zone_type = zone['type']
-                text = zone['text'].strip()
-                
-                if not text:
-                    continue
-                
-                if zone_type == 'title':
-                    md_lines.append(f"\n# {text}\n")
-                elif zone_type == 'subtitle':
-                    md_lines.append(f"\n## {text}\n")
-                elif zone_type == 'header':
-                    md_lines.append(f"\n### {text}\n")
-                elif zone_type == 'list':
-                    items = IntelligentContentAnalyzer.extract_structured_list(text)
-                    for item in items:
-                        indent = "  " * item['level']
-                        md_lines.append(f"{indent}- {item['text']}")
-                    md_lines.append("")
-                elif zone_type == 'card':
-                    md_lines.append(f"\n> **{text}**\n")
-                else:
-                    md_lines.append(f"\n{text}\n")
+            if not text:
+                continue
             
-            # Adiciona tabelas
-            for table in page_data['tables']:
-                md_lines.append("\n")
-                headers = table['headers']
-                rows = table['rows']
-                
-                # Cabeçalho
-                md_lines.append("| " + " | ".join(headers) + " |")
-                md_lines.append("|" + "|".join(["---"] * len(headers)) + "|")
-                
-                # Linhas
-                for row in rows:
-                    md_lines.append("| " + " | ".join(str(c) for c in row) + " |")
-                
+            if zone_type == 'list':
+                items = IntelligentContentAnalyzer.extract_structured_list(text)
+                for item in items:
+                    indent = "  " * item['level']
+                    md_lines.append(f"{indent}- {item['text']}")
                 md_lines.append("")
+            else:
+                prefix, suffix = _MARKDOWN_ZONE_WRAP.get(zone_type, _MARKDOWN_PARAGRAPH_WRAP)
+                md_lines.append(prefix + text + suffix)
+        
+        # Adiciona tabelas
+        for table in page_data['tables']:
+            md_lines.append("\n")
+            headers = table['headers']
+            rows = table['rows']
+            
+            # Cabeçalho
+            md_lines.append("| " + " | ".join(headers) + " |")
+            md_lines.append("|" + "|".join(["---"] * len(headers)) + "|")
+            
+            # Linhas (map(str) em C, sem um gerador por linha)
+            md_lines.extend("| " + " | ".join(map(str, row)) + " |" for row in rows)
+            
+            md_lines.append("")
         
-        output_path.write_text('\n'.join(md_lines), encoding='utf-8')
-        self.log(f"✅ Markdown exportado: {output_path}")
+        return md_lines
+
+
+def _extract_page_range(args) -> List[Dict]:
+    """Extrai um intervalo de páginas em processo separado (função de módulo para pickle)"""
+    pdf_path, start, end, method, enable_ocr = args
+    extractor = AdvancedPDFExtractor(method=method, enable_ocr=enable_ocr,
+                                     log_callback=lambda msg: None)
+    return extractor.extract_pages(pdf_path, start, end)
 
 
 # Função auxiliar para uso rápido
-def extract_pdf_smart(pdf_path: str, output_format: str = 'json') -> Dict:
+def extract_pdf_smart(pdf_path: str, output_format: str = 'json',
+                      workers: Optional[int] = None) -> Dict:
     """
     Função helper para extração rápida e inteligente
     
     Args:
         pdf_path: Caminho do PDF
         output_format: 'json', 'markdown', 'html'
+        workers: Processos para as páginas (padrão: todos os núcleos menos um);
+            PDFs com menos de PAGE_PARALLEL_MIN_PAGES páginas ficam no processo atual
     
     Returns:
         Dados extraídos e análise estrutural
@@ -1141,8 +1927,25 @@ def extract_pdf_smart(pdf_path: str, output_format: str = 'json') -> Dict:
         log_callback=print
     )
     
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 2) - 1)
+    
     path = Path(pdf_path)
-    pages_data = extractor.extract(path)
+    with fitz.open(path) as doc:
+        page_count = doc.page_count
+    
+    # Primeira regra que comporta o número de páginas
+    for max_pages, method, max_workers in SMART_RULES:
+        if max_pages is None or page_count <= max_pages:
+            break
+    
+    if max_workers is not None:
+        workers = min(workers, max_workers)
+    
+    if method == 'batch' or workers <= 1:
+        pages_data = extractor.extract(path)
+    else:
+        pages_data = extractor.extract_parallel(path, workers)
     analysis = extractor.analyze_document_structure(pages_data)
     
     result = {
@@ -3,6 +3,9 @@ Setup Helper for PDF to HTML AI Converter
 Automated installation and environment check
 """
 
+import importlib
+import importlib.util
+import shutil
 import subprocess
 import sys
 import platform
@@ -36,15 +39,14 @@ def check_pip():
     """Check if pip is available"""
     print_header("📦 Checking pip")
     
-    try:
-        subprocess.run([sys.executable, "-m", "pip", "--version"], 
-                      check=True, capture_output=True)
+    # "python -m pip" works when the pip package is importable: no need to spawn it
+    if importlib.util.find_spec("pip") is not None:
         print("✅ pip is available")
         return True
-    except:
-        print("❌ ERROR: pip is not available")
-        print("   Install pip: python -m ensurepip --upgrade")
-        return False
+    
+    print("❌ ERROR: pip is not available")
+    print("   Install pip: python -m ensurepip --upgrade")
+    return False
 
 
 def install_requirements():
@@ -59,11 +61,20 @@ def install_requirements():
     
     print("Installing packages... (this may take a few minutes)")
     
+    # uv resolves and downloads in parallel when available; with pip, prefer
+    # prebuilt wheels over newer sdists (no local builds of camelot/opencv deps)
+    # and skip the self-version check and .pyc pre-compilation
+    uv = shutil.which("uv")
+    if uv:
+        command = [uv, "pip", "install", "--python", sys.executable,
+                   "-r", "requirements.txt", "--upgrade"]
+    else:
+        command = [sys.executable, "-m", "pip", "install", "-r", "requirements.txt",
+                   "--upgrade", "--prefer-binary", "--disable-pip-version-check",
+                   "--no-compile"]
+    
     try:
-        subprocess.run(
-            [sys.executable, "-m", "pip", "install", "-r", "requirements.txt", "--upgrade"],
-            check=True
-        )
+        subprocess.run(command, check=True)
         print("\n✅ All dependencies installed successfully")
         return True
     except subprocess.CalledProcessError as e:
@@ -88,11 +99,14 @@ def check_critical_imports():
     
     failed = []
     
+    # Packages installed by pip in this same run are not in the finders' caches yet
+    importlib.invalidate_caches()
+    
     for import_name, package_name in packages.items():
-        try:
-            __import__(import_name)
+        # find_spec locates the package without running it (no cv2/pandas start-up)
+        if importlib.util.find_spec(import_name) is not None:
             print(f"✅ {package_name}")
-        except ImportError:
+        else:
             print(f"❌ {package_name} - FAILED")
             failed.append(package_name)
     
@@ -109,37 +123,34 @@ def check_ghostscript():
     """Check if Ghostscript is installed (required for Camelot)"""
     print_header("👻 Checking Ghostscript")
     
-    try:
-        if platform.system() == "Windows":
-            subprocess.run(["gswin64c", "--version"], 
-                         check=True, capture_output=True)
-        else:
-            subprocess.run(["gs", "--version"], 
-                         check=True, capture_output=True)
-        
+    if platform.system() == "Windows":
+        executables = ("gswin64c", "gswin32c")
+    else:
+        executables = ("gs",)
+    
+    # Looks the binary up on PATH instead of starting it with --version
+    if any(shutil.which(name) for name in executables):
         print("✅ Ghostscript is installed")
         return True
-    except:
-        print("⚠ WARNING: Ghostscript not found")
-        print("   Ghostscript is required for advanced table extraction")
-        print("   Install from: https://www.ghostscript.com/")
-        return False
+    
+    print("⚠ WARNING: Ghostscript not found")
+    print("   Ghostscript is required for advanced table extraction")
+    print("   Install from: https://www.ghostscript.com/")
+    return False
 
 
 def check_tesseract():
     """Check if Tesseract OCR is installed"""
     print_header("📖 Checking Tesseract OCR (Optional)")
     
-    try:
-        subprocess.run(["tesseract", "--version"], 
-                      check=True, capture_output=True)
+    if shutil.which("tesseract"):
         print("✅ Tesseract OCR is installed")
         return True
-    except:
-        print("ℹ INFO: Tesseract OCR not found (optional)")
-        print("   Required only for OCR on scanned PDFs")
-        print("   Install: https://github.com/UB-Mannheim/tesseract/wiki")
-        return False
+    
+    print("ℹ INFO: Tesseract OCR not found (optional)")
+    print("   Required only for OCR on scanned PDFs")
+    print("   Install: https://github.com/UB-Mannheim/tesseract/wiki")
+    return False
 
 
 def create_test_config():
@@ -156,7 +167,8 @@ def create_test_config():
     "responsive_design": true,
     "animations": true,
     "enable_ocr": false,
-    "export_markdown": false
+    "export_markdown": false,
+    "parallel_extraction": true
 }''')
         print("✅ Created config.json")
     